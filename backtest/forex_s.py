@@ -1,4 +1,7 @@
-from tradex.strategy.indicators import Indicator
+from tradex.strategy.registry import IndicatorRegistry
+from tradex.strategy.cache import cache
+from functools import partial
+import uuid
 import talib
 # from tradex.patterns.oneliner import Hammer, InvertedHammer
 # from tradex.patterns.doubleliner import Engulfing,\
@@ -21,17 +24,23 @@ class Strat2:
 
     def __init__(self, frame):
 
-        self.rsi = Indicator('rsi', talib.RSI)
-        self.ema200 = Indicator('ema200', talib.EMA, timeperiod=200)
-        self.ema100 = Indicator('ema100', talib.EMA, timeperiod=100)
-        self.ema50 = Indicator('ema50', talib.EMA, timeperiod=50)
-        self.ema20 = Indicator('ema20', talib.EMA, timeperiod=20)
-        self.stoch = Indicator(
+        self.registry = IndicatorRegistry()
+        # key of this backtest's bars in the shared indicator cache, never
+        # reused (id() is, once an instance is garbage collected)
+        self.series = ('backtest', uuid.uuid4().hex)
+        add = partial(self.registry.register, 'backtest')
+
+        self.rsi = add('rsi', talib.RSI)
+        self.ema200 = add('ema200', talib.EMA, timeperiod=200)
+        self.ema100 = add('ema100', talib.EMA, timeperiod=100)
+        self.ema50 = add('ema50', talib.EMA, timeperiod=50)
+        self.ema20 = add('ema20', talib.EMA, timeperiod=20)
+        self.stoch = add(
             'stoch', talib.STOCH, lis=['high', 'low', 'close'], no=2)
-        self.macd = Indicator('macd',
+        self.macd = add('macd',
             talib.MACD, no=3, fastperiod=6, slowperiod=13, signalperiod=4
         )
-        self.adx = Indicator(
+        self.adx = add(
             'adx', talib.ADX, lis=['high', 'low', 'close'])
 
         self.new = pd.DataFrame()
@@ -63,14 +72,8 @@ class Strat2:
                 return
 
     def update_indicators(self, val):
-        self.ema200.update(val)
-        self.ema100.update(val)
-        self.ema50.update(val)
-        self.ema20.update(val)
-        self.rsi.update(val)
-        self.stoch.update(val)
-        self.macd.update(val)
-        self.adx.update(val)
+        # every indicator in one pass over the shared ohlc columns
+        self.registry.update({'backtest': val})
 
     def verify_stochastic_bullish(self, v):
         try:
@@ -108,38 +111,30 @@ class Strat2:
             return True
         return False
 
+    def ohlc(self):
+        return [self.new[x].values for x in ['open', 'high', 'low', 'close']]
+
+    def pattern(self, func):
+        # Newest value of a candle pattern, computed once per bar
+        return cache.get(
+            self.series, self.new.index[-1], func, self.ohlc)[-1]
+
     def confirm_bear_patterns(self):
         if(
-            talib.CDLENGULFING(
-                self.new.open, self.new.high, self.new.low, self.new.close
-            )[-1] == -100 or
-            talib.CDLEVENINGSTAR(
-                self.new.open, self.new.high, self.new.low, self.new.close
-            )[-1] == 100 or
-            talib.CDLEVENINGDOJISTAR(
-                self.new.open, self.new.high, self.new.low, self.new.close
-            )[-1] == 100 or
-            talib.CDLDARKCLOUDCOVER(
-                self.new.open, self.new.high, self.new.low, self.new.close
-            )[-1] == 100
+            self.pattern(talib.CDLENGULFING) == -100 or
+            self.pattern(talib.CDLEVENINGSTAR) == 100 or
+            self.pattern(talib.CDLEVENINGDOJISTAR) == 100 or
+            self.pattern(talib.CDLDARKCLOUDCOVER) == 100
         ):
             return True
         return False
 
     def confirm_bull_patterns(self):
         if(
-            talib.CDLENGULFING(
-                self.new.open, self.new.high, self.new.low, self.new.close
-            )[-1] == 100 or
-            talib.CDLMORNINGSTAR(
-                self.new.open, self.new.high, self.new.low, self.new.close
-            )[-1] == 100 or
-            talib.CDLMORNINGDOJISTAR(
-                self.new.open, self.new.high, self.new.low, self.new.close
-            )[-1] == 100 or
-            talib.CDLPIERCING(
-                self.new.open, self.new.high, self.new.low, self.new.close
-            )[-1] == 100
+            self.pattern(talib.CDLENGULFING) == 100 or
+            self.pattern(talib.CDLMORNINGSTAR) == 100 or
+            self.pattern(talib.CDLMORNINGDOJISTAR) == 100 or
+            self.pattern(talib.CDLPIERCING) == 100
         ):
             return True
         return False
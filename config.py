@@ -23,6 +23,14 @@ M_PUSH_PORTS = {
     value: PUSH_PORTS + index for index, value in enumerate(MARKET_PAIRS)
 }
 
+# single bar output of the multi pair ingestion host, first port after
+# the per pair push ports
+HOST_PUSH_PORT = PUSH_PORTS + len(MARKET_PAIRS)
+
+# sharded ingestion, the tick feed of the workers binds on this port and
+# worker n pushes its bars on SHARD_BASE_PORT + 1 + n
+SHARD_BASE_PORT = HOST_PUSH_PORT + 1
+
 INFLUXDB_PORT = parse_to_integer("InfluxDbPortNo")
 
 USER = 'devcode'
@@ -33,6 +41,8 @@ SERVER_SUB_PORT = parse_to_integer("MetaSubPort")
 
 MT4_PATH = f'/home/{USER}/.wine/drive_c/Program Files (x86)/Tickmill MT4 Client Terminal/history/Tickmill-DemoUK/'
 
+BAR_STORE_PATH = os.getenv("BarStorePath", f'/home/{USER}/.tradex/bars/')
+
 MOCK_SUB_PORT = parse_to_integer("MockSubPort")
 MOCK_ROUTER_PORT = parse_to_integer("MockRouterPort")
 INTERMED_ROUTER = parse_to_integer("InterRouterNo")
@@ -21,6 +21,7 @@ import os
 
 from tradex.config import MARKET_PAIRS,INTERMED_PORT,\
 SERVER_PUSH_PORT,SERVER_PULL_PORT,SERVER_SUB_PORT,MOCK_PORT
+from tradex.market.wire import encode_tick, KILL
 
 import zmq
 from time import sleep
@@ -42,7 +43,8 @@ class DWX_ZeroMQ_Connector():
                  _PULL_PORT=SERVER_PULL_PORT,           # Port for Receiving responses
                  _SUB_PORT=SERVER_SUB_PORT,            # Port for Subscribing for prices
                  _delimiter=';',
-                 _verbose=False):           # String delimiter           
+                 _verbose=False,            # String delimiter           
+                 _binary_ticks=False):      # Rebroadcast ticks as binary frames
         # Strategy Status (if this is False, ZeroMQ will not listen for data)
         self._ACTIVE = True
 
@@ -94,6 +96,10 @@ class DWX_ZeroMQ_Connector():
         # Start listening for responses to commands and new market data
         self._string_delimiter = _delimiter
 
+        # Rebroadcast ticks as [symbol, packed bid/ask/time] multipart
+        # messages (see market.wire) instead of 'SYMBOL bid;ask;time' strings
+        self._binary_ticks = _binary_ticks
+
         # BID/ASK Market Data Subscription Threads ({SYMBOL: Thread})
         self._MarketData_Thread = None
 
@@ -410,7 +416,11 @@ class DWX_ZeroMQ_Connector():
                         # _bid, _ask = _data.split(string_delimiter)
                         _timestamp = Timestamp.now('UTC').timestamp()
 
-                        self._PUB_SOCKET.send_string(f'{msg};{_timestamp}')
+                        if self._binary_ticks:
+                            self._PUB_SOCKET.send_multipart(
+                                self._pack_tick(msg, _timestamp, string_delimiter))
+                        else:
+                            self._PUB_SOCKET.send_string(f'{msg};{_timestamp}')
 
                         # if self._verbose:
                         #     print("\n[" + _symbol + "] " + _timestamp + " (" + _bid + "/" + _ask + ") BID/ASK")
@@ -430,6 +440,14 @@ class DWX_ZeroMQ_Connector():
                     self._PUB_SOCKET.close()
                     self._ZMQ_CONTEXT.term()
                 
+    def _pack_tick(self, msg, _timestamp, string_delimiter=';'):
+        # 'SYMBOL bid;ask' from MetaTrader to a binary tick message
+        _symbol, _data = msg.split(" ")
+        if _data == 'kill':
+            return [_symbol.encode(), KILL]
+        _bid, _ask = _data.split(string_delimiter)
+        return encode_tick(_symbol, float(_bid), float(_ask), _timestamp)
+
     ##########################################################################
 
     """
@@ -0,0 +1,204 @@
+
+################# REGULAR PYTHON IMPORTS ##################
+from collections import namedtuple, OrderedDict
+
+
+# Bar lengths in seconds, every bar is aligned on multiples of its length
+# counted from the unix epoch (so H4 bars start at 00:00, 04:00, ... UTC)
+TIMEFRAMES = OrderedDict([
+    ('M1', 60),
+    ('M5', 5 * 60),
+    ('M15', 15 * 60),
+    ('H1', 60 * 60),
+    ('H4', 4 * 60 * 60),
+    ('D1', 24 * 60 * 60),
+])
+
+
+Bar = namedtuple('Bar', ['time', 'open', 'high', 'low', 'close', 'ticks'])
+
+
+class BarBuilder:
+
+    """
+    Streaming open,high,low,close builder for a single bar length.
+
+    Every price is folded into the currently open bar in place, the
+    finished bar is returned the moment a price lands in a later bucket.
+    Buckets are computed from the timestamp itself, so gaps of several
+    minutes or hour/day rollovers close the open bar just the same.
+
+    [INIT VALUES]
+
+    1. seconds :== length of a bar in seconds, see TIMEFRAMES
+
+    """
+
+    def __init__(self, seconds=60):
+        self.seconds = int(seconds)
+        # start of the newest bar handed out as finished
+        self.closed = None
+        self._reset(None)
+
+    def _reset(self, start):
+        self.start = start
+        self.open = self.high = self.low = self.close = None
+        self.ticks = 0
+
+    def bucket(self, timestamp):
+        return int(timestamp // self.seconds) * self.seconds
+
+    @property
+    def bar(self):
+        # The currently open (not yet finished) bar, if any
+        if self.start is None:
+            return None
+        return Bar(
+            self.start, self.open, self.high,
+            self.low, self.close, self.ticks)
+
+    def update(self, timestamp, price):
+        """
+            Folds one price into the open bar and returns the finished
+            Bar when timestamp crosses into a new bucket, else None
+        """
+
+        start = self.bucket(timestamp)
+        finished = None
+
+        if self.start is not None and start != self.start:
+            if start < self.start:
+                # Late tick for a bar that was already sent, drop it
+                return None
+            finished = self.bar
+            self._reset(None)
+
+        if self.start is None:
+            self.start = start
+            self.open = self.high = self.low = price
+        elif price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+
+        self.close = price
+        self.ticks += 1
+        return finished
+
+    def merge(self, bar, span=60):
+        """
+            Folds a finished shorter bar of length "span" into the open bar.
+            Returns the list of bars it finished: the previous open bar if
+            bar belongs to a later bucket, and the open bar itself once bar
+            is the last one of its bucket.
+        """
+
+        start = self.bucket(bar.time)
+        finished = []
+
+        if self.closed is not None and start <= self.closed:
+            # Bar of a bucket that was already closed, drop it
+            return finished
+
+        if self.start is not None and start != self.start:
+            if start < self.start:
+                return finished
+            finished.append(self.flush())
+
+        if self.start is None:
+            self.start = start
+            self.open, self.high, self.low = bar.open, bar.high, bar.low
+        else:
+            self.high = max(self.high, bar.high)
+            self.low = min(self.low, bar.low)
+
+        self.close = bar.close
+        self.ticks += bar.ticks
+
+        if bar.time + span >= start + self.seconds:
+            finished.append(self.flush())
+        return finished
+
+    def flush(self):
+        # Returns the open bar as finished and starts from scratch
+        finished = self.bar
+        if finished is not None:
+            self.closed = finished.time
+        self._reset(None)
+        return finished
+
+
+class Rollup:
+
+    """
+    Incremental rollup of finished M1 bars into every higher timeframe.
+
+    Each M1 bar is folded into the open M5/M15/H1/H4/D1 bars in O(1), a
+    higher bar is closed the moment the M1 bar ending its bucket arrives
+    (or when a later bar shows the bucket was left behind by a gap), no
+    history is ever resampled.
+
+    Callbacks registered with on_close(callback) are called with
+    (timeframe, Bar) for every bar closed.
+    """
+
+    def __init__(self, timeframes=('M5', 'M15', 'H1', 'H4', 'D1'), base='M1'):
+        self.span = TIMEFRAMES[base]
+        self.builders = OrderedDict(
+            (name, BarBuilder(TIMEFRAMES[name])) for name in timeframes)
+        self._listeners = []
+
+    def on_close(self, callback):
+        self._listeners.append(callback)
+
+    def _merge(self, bar):
+        closed = []
+        for name, builder in self.builders.items():
+            for finished in builder.merge(bar, self.span):
+                closed.append((name, finished))
+        return closed
+
+    def prime(self, bars):
+        # Rebuilds the open bars from history without firing any event
+        for bar in bars:
+            self._merge(bar)
+
+    def update(self, bar):
+        # Folds one M1 bar in, returns the list of (timeframe, Bar) closed
+        closed = self._merge(bar)
+        for name, finished in closed:
+            for callback in self._listeners:
+                callback(name, finished)
+        return closed
+
+
+class BarAggregator:
+
+    """
+    Runs one BarBuilder per timeframe, so a single pass over the ticks
+    produces every bar length at once.
+
+    update() returns a list of (timeframe, Bar) for every bar the
+    tick finished, ordered from the shortest to the longest timeframe.
+    """
+
+    def __init__(self, timeframes=None):
+        timeframes = list(TIMEFRAMES) if timeframes is None else timeframes
+        self.builders = OrderedDict(
+            (name, BarBuilder(TIMEFRAMES[name])) for name in timeframes)
+
+    def update(self, timestamp, price):
+        finished = []
+        for name, builder in self.builders.items():
+            bar = builder.update(timestamp, price)
+            if bar is not None:
+                finished.append((name, bar))
+        return finished
+
+    def flush(self):
+        finished = []
+        for name, builder in self.builders.items():
+            bar = builder.flush()
+            if bar is not None:
+                finished.append((name, bar))
+        return finished
@@ -1,18 +1,19 @@
 
-################# REGULAR PYTHON IMPORTS ##################
-import pickle
-
 ################# LIBRARY IMPORTS ##################
 
 import zmq
-import pandas as pd
-import numpy as np
+from pandas.tseries.frequencies import to_offset
 
 ################# Object IMPORTS ##################
 
 # from zmq.error import ContextTerminated
 
 from tradex.config import M_PUSH_PORTS, M_SUB_PORT
+from tradex.market.buffers import TickStore
+from tradex.market.bars import BarBuilder, TIMEFRAMES
+from tradex.market.frames import fill_gaps, resample_ohlc
+from tradex.market.poller import EventLoop
+from tradex.market.wire import encode_bars, decode_ticks, KILL
 
 
 class MarketPair:
@@ -21,7 +22,7 @@ class MarketPair:
 
     def __init__(
         self, pair, string_delimiter=';',
-            router_port=None, sub_port=None):
+            router_port=None, sub_port=None, tick_capacity=2 ** 16):
 
         self.sub_port = sub_port
         self.router_port = router_port
@@ -45,6 +46,9 @@ class MarketPair:
         the class's sub socket connects to fr receiving subscription
         messages
 
+        5. tick_capacity :== Number of ticks kept in the preallocated
+        tick ring buffer, older ticks get overwritten once it is full
+
         """
         try:
             # Define push port and delimiter
@@ -66,39 +70,37 @@ class MarketPair:
             # subscribing for messages sent on sub socket....
             self.pair_name = pair
 
-            # initial tick frame set to empty values,
-            # this value changes every second/nth-second
-            self.df_tick = pd.DataFrame(
-                {}, index=pd.to_datetime([]), columns=['Bid', 'Ask']
-            )
+            # preallocated tick ring buffer, ticks are written into it
+            # in place every second/nth-second
+            self.df_tick = TickStore(tick_capacity)
+
+            # streaming minute bar, updated in place on every bid and
+            # handed over to the push socket once a tick crosses the minute
+            self.bars = BarBuilder(TIMEFRAMES['M1'])
         except Exception:
             self.shutdown_sockets()
             raise Exception(
                 "Error while trying to setup base class values")
 
     @staticmethod
-    def fill_missing_indexes_values(frame):
-        # This class takes a dataframe, creates a date range that
-        # spans through the first and last index values of dataframe
-        # with a freq of 1T, loops via date range and for each date value
-        # verifies if not in frame's index, creates a nan series and
-        # appends to original frame, after loooping returns new frame
-
-        date_range = pd.date_range(frame.index[0], frame.index[-1], freq='1T')
-        for date in date_range:
-            if date not in frame.index:
-                ser = pd.Series(
-                    np.array([np.NAN, np.NAN, np.NAN, np.NAN]),
-                    index=['open', 'high', 'low', 'close'],
-                    name=date, dtype=np.float64)
-                frame = frame.append(ser)
-        return frame.sort_index(axis=0)
+    def fill_missing_indexes_values(frame, calendar=None):
+        # This method takes a dataframe and reindexes it in one pass onto
+        # a 1T date range spanning its first and last index values, every
+        # missing minute becomes a nan row, calendar optionally restricts
+        # which minutes get filled (see market.frames.forex_session)
+
+        frame, _ = fill_gaps(frame, 60, calendar)
+        return frame
 
     @staticmethod
     def resample_frame(time_interval, frame):
         """
             Returns DataFrame containing resampled data
 
+            time_interval is either a pandas offset string ('5T', '1H')
+            or the bar length in seconds, buckets holding a nan open
+            come back as nan rows just like before
+
             [NOTE] : This method depends solely on the ["self.M1"]
             attribute to be a DataFrame containing correct
             time values for it to work
@@ -107,31 +109,10 @@ class MarketPair:
             with uniform values for it to work....
         """
 
-        index = ['open', 'high', 'low', 'close']
-
-        def kl(x, *args):
-
-            # Check for missing/NAN values in resampled data
-            # and return NAN series if any, else it gets
-            # captured data and computes open,high,low,close values
-            # creates new series containing new values and returns it
-
-            if x['open'].isna().any():  # Keep track of this potential bug
-                return pd.Series(
-                    np.array([np.NAN, np.NAN, np.NAN, np.NAN]),
-                    index=index)
-
-            init = x['open'][0]
-            last = x['close'][-1]
-            new_max = x[['high', 'low']].max().max()
-            new_min = x[['high', 'low']].min().min()
-
-            return pd.Series([init, new_max, new_min, last], index=index)
+        if isinstance(time_interval, str):
+            time_interval = to_offset(time_interval).nanos // 10 ** 9
 
-            # Not hoping for this error though but just in case...
-            raise(Exception('Na Mad Error wey dey here so....'))
-
-        return frame.resample(time_interval).apply(kl)
+        return resample_ohlc(frame, time_interval)
 
     def shutdown_sockets(self):
         # closes bound push and pull sockets
@@ -147,9 +128,10 @@ class MarketPair:
         The start function defined by start();
         It connects MARKETCLIENT with the router connnector, through
         router port no
-        The main aim of this class is to keep on appending tick frames
-        till the tick crosses minute mark then computes tick data to be
-        resampled, pickle dumps it and sends it through push socket
+        The main aim of this class is to keep on writing ticks into the
+        tick store and the streaming minute bar, once a tick crosses the
+        minute mark the finished bar is encoded as a binary bar frame
+        (see market.wire) and sent through push socket
 
     #####################################################################
 
@@ -183,56 +165,67 @@ class MarketPair:
 
         print('\n', '\t\t ##### receiving data and sending #####')
 
-        while True:
-            try:
-                msg = _subscribe.recv_string(zmq.DONTWAIT)
-                if msg != '':
-                    print(msg.split(" "))
-                    _symbol, _data = msg.split(" ")
-                    if _data == 'kill':
-                        print('Received killing code... Killing now')
-                        self.push.send(b'kill')
-                        self.push.close()
-                        _subscribe.close()
-                        _context.term()
-                        break
-                    _bid, _ask, _timestamp = _data.split(self.string_delimiter)
-
-                    self.df_tick = self.df_tick.append(
-                        pd.DataFrame({
-                            'Bid': [float(_bid)], 'Ask': [float(_ask)]
-                        },
-                            index=pd.to_datetime(
-                                [pd.Timestamp.fromtimestamp(
-                                    float(_timestamp))])
-                        ))
-
-                    print('Received message .... ', msg)
-
-                    last_last_val = self.df_tick.index[-2]
-                    last_val = self.df_tick.index[-1]
-
-                    if last_val.minute - last_last_val.minute == 1:
-                        range_1 = str(
-                            last_last_val.replace(
-                                second=0, microsecond=0))
-
-                        range_2 = str(last_last_val)
-
-                        dump_data = pickle.dumps(
-                            self.df_tick.loc[range_1:range_2]['Bid'].resample(
-                                '1Min').ohlc()
-                        )
-
-                        self.push.send(dump_data)
-
-            except zmq.error.Again:
-                pass
-            except ValueError:
-                print("Value Error..... Bug Found...Test code!!!")
-                pass
-            except IndexError:
-                continue
-            except KeyboardInterrupt:
-                _subscribe.close()
-                _context.term()
+        loop = EventLoop()
+        loop.register(_subscribe, self.on_message)
+        try:
+            loop.run()
+        finally:
+            _subscribe.close()
+            _context.term()
+
+    def on_message(self, frames):
+        # Event loop handler of the sub socket, returns False to stop it
+        try:
+            if self.handle_message(frames):
+                return True
+        except ValueError:
+            print("Value Error..... Bug Found...Test code!!!")
+            return True
+
+        print('Received killing code... Killing now')
+        self.push.send(b'kill')
+        self.push.close()
+        return False
+
+    def handle_message(self, frames):
+        """
+            Handles one message received on the sub socket, either the
+            legacy 'SYMBOL bid;ask;timestamp' string or the binary
+            [SYMBOL, packed ticks] multipart message (see market.wire),
+            binary ticks are decoded straight into the tick store.
+
+            Returns False if the message is the kill code, else True
+        """
+
+        if len(frames) == 2:
+            if frames[1] == KILL:
+                return False
+            ticks = decode_ticks(frames[1])
+            self.df_tick.extend_ticks(ticks)
+            for stamp, price in zip(
+                    ticks['time'].tolist(), ticks['bid'].tolist()):
+                self.on_tick(stamp, price)
+            return True
+
+        msg = frames[0].decode()
+        if msg == '':
+            return True
+
+        _symbol, _data = msg.split(" ")
+        if _data == 'kill':
+            return False
+        _bid, _ask, _timestamp = _data.split(self.string_delimiter)
+
+        _stamp = float(_timestamp)
+        _price = float(_bid)
+
+        self.df_tick.append(_stamp, _price, float(_ask))
+        self.on_tick(_stamp, _price)
+        return True
+
+    def on_tick(self, timestamp, price):
+        # Folds a bid into the minute bar and pushes the bar once finished
+        bar = self.bars.update(timestamp, price)
+
+        if bar is not None:
+            self.push.send(encode_bars([bar]))
@@ -0,0 +1,212 @@
+
+################# LIBRARY IMPORTS ##################
+
+import numpy as np
+import pandas as pd
+
+################# Object IMPORTS ##################
+
+from tradex.market.frames import epoch_seconds
+
+
+class RingBuffer:
+
+    """
+    Fixed capacity, NumPy backed columnar ring buffer.
+
+    Every column is stored twice back to back ("double write"), so the
+    newest n rows (n <= capacity) are always one contiguous slice of the
+    backing array. That keeps appends O(1) and lets readers take
+    zero-copy views without ever unrolling the ring.
+
+    [INIT VALUES]
+
+    1. capacity :== maximum number of rows kept, older rows are
+    overwritten once the buffer is full
+
+    2. columns :== names of the columns, in the order values are
+    passed to append()
+
+    """
+
+    def __init__(self, capacity, columns, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("Capacity of a ring buffer must be at least 1")
+
+        self.capacity = int(capacity)
+        self.columns = tuple(columns)
+        self._position = {name: i for i, name in enumerate(self.columns)}
+        self._data = np.zeros(
+            (len(self.columns), 2 * self.capacity), dtype=dtype)
+
+        # index the next row is written to and number of rows held
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, *values):
+        head = self._head
+        self._data[:, head] = values
+        self._data[:, head + self.capacity] = values
+
+        self._head = (head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def replace_last(self, *values):
+        # Overwrites the newest row in place
+        if self._size == 0:
+            raise IndexError("Ring buffer is empty")
+        last = (self._head - 1) % self.capacity
+        self._data[:, last] = values
+        self._data[:, last + self.capacity] = values
+
+    def extend(self, values):
+        # Appends a (columns, k) block of rows in at most two slice writes
+        values = np.asarray(values, dtype=self._data.dtype)
+        k = values.shape[1]
+        if k > self.capacity:
+            values, k = values[:, -self.capacity:], self.capacity
+
+        head, capacity = self._head, self.capacity
+        first = min(k, capacity - head)
+        self._data[:, head:head + first] = values[:, :first]
+        self._data[:, head + capacity:head + capacity + first] = \
+            values[:, :first]
+
+        rest = k - first
+        if rest:
+            self._data[:, :rest] = values[:, first:]
+            self._data[:, capacity:capacity + rest] = values[:, first:]
+
+        self._head = (head + k) % capacity
+        self._size = min(self._size + k, capacity)
+
+    def resize(self, capacity):
+        # Reallocates the buffer keeping the newest rows that still fit
+        rows = self.view().copy()
+        RingBuffer.__init__(self, capacity, self.columns, self._data.dtype)
+        self.extend(rows)
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def _bounds(self, n):
+        n = self._size if n is None else min(int(n), self._size)
+        end = self._head + self.capacity
+        return end - n, end
+
+    def column(self, name, n=None):
+        # Zero-copy read only view of the newest n values of a column
+        start, end = self._bounds(n)
+        view = self._data[self._position[name], start:end]
+        view.flags.writeable = False
+        return view
+
+    def view(self, n=None):
+        # Zero-copy (columns, n) view of the newest n rows
+        start, end = self._bounds(n)
+        view = self._data[:, start:end]
+        view.flags.writeable = False
+        return view
+
+    def last(self, name):
+        if self._size == 0:
+            raise IndexError("Ring buffer is empty")
+        return self._data[self._position[name], self._head + self.capacity - 1]
+
+
+class BarWindow(RingBuffer):
+
+    """
+    Rolling window of the newest bars of one timeframe, replaces the ever
+    growing frames built with DataFrame.append. Memory is fixed by the
+    capacity, which should be the longest lookback any strategy or
+    indicator reading the window needs.
+
+    to_frame() gives the usual open,high,low,close DataFrame (indexed by
+    utc time) for code that still wants one, column() gives zero-copy
+    NumPy views for code that does not.
+    """
+
+    columns = ('time', 'open', 'high', 'low', 'close')
+
+    def __init__(self, capacity=500):
+        super().__init__(capacity, self.columns)
+
+    def append_bar(self, bar):
+        # A bar with the same time as the newest one replaces it, so a
+        # partial bar seeded from history gets completed, not duplicated
+        values = (bar.time, bar.open, bar.high, bar.low, bar.close)
+        if len(self) and self.last('time') == bar.time:
+            self.replace_last(*values)
+        else:
+            self.append(*values)
+
+    def extend_frame(self, frame):
+        # Appends every row of an open,high,low,close frame
+        stamps = epoch_seconds(frame.index).astype(np.float64)
+        self.extend(np.vstack([stamps] + [
+            frame[x].values.astype(np.float64) for x in self.columns[1:]]))
+
+    def to_frame(self, n=None):
+        view = self.view(n)
+        index = pd.to_datetime(view[0].astype(np.int64), unit='s')
+        index.name = 'time'
+        return pd.DataFrame(
+            view[1:].T.copy(), index=index, columns=list(self.columns[1:]))
+
+
+class TickStore(RingBuffer):
+
+    """
+    Ring buffer of raw ticks (epoch seconds, bid, ask) for a single
+    market pair. Memory is allocated once and stays flat no matter how
+    long the process runs, the oldest ticks are simply overwritten.
+
+    Timestamps are expected to arrive in order, which is what lets
+    between()/minute() locate ticks with a binary search.
+    """
+
+    columns = ('time', 'bid', 'ask')
+
+    def __init__(self, capacity=2 ** 16):
+        super().__init__(capacity, self.columns)
+
+    def append(self, timestamp, bid, ask):
+        super().append(timestamp, bid, ask)
+
+    def extend_ticks(self, ticks):
+        # Writes a record array of ticks (market.wire.TICK_RECORD)
+        if len(ticks) == 1:
+            tick = ticks[0]
+            self.append(tick['time'], tick['bid'], tick['ask'])
+        else:
+            self.extend([ticks['time'], ticks['bid'], ticks['ask']])
+
+    def between(self, start, end):
+        """
+            Returns zero-copy (time, bid, ask) views of the ticks whose
+            timestamps fall in [start, end)
+        """
+
+        view = self.view()
+        times = view[0]
+        left = times.searchsorted(start, side='left')
+        right = times.searchsorted(end, side='left')
+        return view[0, left:right], view[1, left:right], view[2, left:right]
+
+    def minute(self, timestamp):
+        # Views of the ticks in the minute that contains timestamp
+        start = timestamp - timestamp % 60
+        return self.between(start, start + 60)
+
+    def to_frame(self):
+        # Copy of the buffered ticks as the old Bid/Ask tick frame
+        times, bid, ask = self.view()
+        return pd.DataFrame(
+            {'Bid': bid.copy(), 'Ask': ask.copy()},
+            index=pd.to_datetime(times, unit='s'))
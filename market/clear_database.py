@@ -4,6 +4,7 @@ import sys
 
 from influxdb import DataFrameClient
 from tradex.config import MARKET_PAIRS
+from tradex.market.store import BarStore
 
 
 def main(pair=None, logic=None):
@@ -12,13 +13,19 @@ def main(pair=None, logic=None):
 
     lis = [i for x in database for i in x.values() if i in MARKET_PAIRS]
 
+    # The local bar store of a pair is dropped along with its database,
+    # even if the database itself is already gone
     if logic:
         for x in lis:
             df.drop_database(x)
+        for x in MARKET_PAIRS:
+            BarStore(x).drop()
         return 'Finished'
 
-    elif pair in lis:
-        df.drop_database(pair)
+    elif pair is not None:
+        if pair in lis:
+            df.drop_database(pair)
+        BarStore(pair).drop()
         return
 
 
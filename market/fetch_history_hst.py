@@ -1,75 +1,155 @@
-import time
+import calendar
+import os
 import struct
+import numpy as np
 import pandas as pd
-# import pickle
 import sys
 
 
-frame = {
-    'time': [],
-        'open': [],
-        'high': [],
-        'low': [],
-        'close': [],
-        'volume': [],
-        'spread': [],
-        'real_volume': [],
-}
+# MT4 (build 600+) history files start with a 148 byte header followed by
+# fixed size 60 byte records of struct '<Q4dqiq'
+HEADER_SIZE = 148
 
-year_range = [2014, 2015, 2016, 2017, 2018, 2019, 2020]
+HST_RECORD = np.dtype([
+    ('time', '<u8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<i8'),
+    ('spread', '<i4'),
+    ('real_volume', '<i8'),
+])
+
+
+def record_count(file):
+    # Number of complete records held in an .hst file
+    size = os.path.getsize(file)
+    return max(size - HEADER_SIZE, 0) // HST_RECORD.itemsize
+
+
+def map_hst(file):
+    """
+        Memory maps the records of an .hst file as a read only NumPy
+        structured array, a file holding no complete record returns an
+        empty array
+    """
+
+    count = record_count(file)
+    if count == 0:
+        return np.empty(0, dtype=HST_RECORD)
+
+    return np.memmap(
+        file, dtype=HST_RECORD, mode='r',
+        offset=HEADER_SIZE, shape=(count,))
+
+
+def records_to_frame(records):
+    # Copies the open,high,low,close columns of hst records into a frame
+    # indexed by the (utc) record time
+    index = pd.to_datetime(
+        records['time'].astype(np.int64), unit='s')
+    index.name = 'time'
+    frame = pd.DataFrame(
+        {x: np.array(records[x]) for x in ['open', 'high', 'low', 'close']},
+        index=index,
+        columns=['open', 'high', 'low', 'close'])
+    return frame
 
 
 def parse_hst(file, year_val=None, range1=None, range2=None):
-    global year_range, frame
-
-    header = 148
-    body = 60
-
-    index_f = header
-    index_last = 208
-
-    statement = 'year >= int(year_val)'
-    if range1 or range2:
-        statement = 'range1 <= parsed_data[0] <= range2'
-
-    with open(file, 'rb') as f:
-        data = f.read()
-
-    while True:
-        try:
-            b_data = data[index_f:index_last]
-            parsed_data = struct.unpack('<Q4dqiq', b_data)
-            date = time.gmtime(parsed_data[0])
-            year = date.tm_year
-            if (eval(statement)):
-                frame['time'].append(
-                    pd.Timestamp.utcfromtimestamp(parsed_data[0]))
-                frame['open'].append(parsed_data[1])
-                frame['high'].append(parsed_data[2])
-                frame['low'].append(parsed_data[3])
-                frame['close'].append(parsed_data[4])
-                frame['volume'].append(parsed_data[5])
-                frame['spread'].append(parsed_data[6])
-                frame['real_volume'].append(parsed_data[7])
-        except OSError:
-            pass
-        except struct.error:
-            break
-        except OverflowError:
-            pass
-        except KeyboardInterrupt:
-            break
-
-        index_f += 60
-        index_last += 60
-
-    df = pd.DataFrame(frame)
-    df.index = pd.to_datetime(df['time'])
-    df = df.sort_index(axis=0)
-
-    # print('\n','\t\t','#'*10,'Pandas DataFrame','#'*10,'\n')
-
-    return df[['open', 'high', 'low', 'close']]
+    """
+        Returns the open,high,low,close frame of an MT4 .hst file.
+
+        year_val keeps records from the start of that year onwards,
+        range1/range2 keep records with range1 <= time <= range2 (unix
+        seconds, either one may be left out). Records are filtered with a
+        binary search on the time column, no record is decoded in python
+    """
+
+    records = map_hst(file)
+    times = records['time']
+
+    start, end = None, None
+    if range1 is not None or range2 is not None:
+        start, end = range1, range2
+    elif year_val is not None:
+        start = calendar.timegm((int(year_val), 1, 1, 0, 0, 0))
+
+    if len(times) and np.all(times[1:] >= times[:-1]):
+        left = 0 if start is None else times.searchsorted(start, 'left')
+        right = len(times) if end is None else \
+            times.searchsorted(end, 'right')
+        selected = records[left:right]
+    else:
+        # Unsorted file, fall back to a vectorized mask
+        mask = np.ones(len(times), dtype=bool)
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times <= end
+        selected = records[mask]
+
+    return records_to_frame(selected).sort_index(axis=0)
+
+
+def seek_hst(fp, count, timestamp):
+    """
+        Binary search over the fixed size records of an open .hst file,
+        returns the number of the first record whose time is at or after
+        timestamp (count if there is none), reading 8 bytes per probe
+    """
+
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        fp.seek(HEADER_SIZE + middle * HST_RECORD.itemsize)
+        stamp, = struct.unpack('<Q', fp.read(8))
+        if stamp < timestamp:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def iter_hst(file, start=None, end=None, chunk_size=50000):
+    """
+        Generator yielding open,high,low,close frames of at most chunk_size
+        records from an .hst file, starting at the first record at or
+        after start and stopping after the last one at or before end (unix
+        seconds). Only the records in that range are ever read from disk,
+        so files larger than memory can be streamed.
+    """
+
+    count = record_count(file)
+    size = HST_RECORD.itemsize
+
+    with open(file, 'rb') as fp:
+        first = 0 if start is None else seek_hst(fp, count, start)
+        fp.seek(HEADER_SIZE + first * size)
+        remaining = count - first
+
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            records = np.frombuffer(fp.read(n * size), dtype=HST_RECORD)
+            remaining -= n
+
+            if end is not None:
+                stop = records['time'].searchsorted(end, 'right')
+                if stop < len(records):
+                    records = records[:stop]
+                    remaining = 0
+
+            if len(records):
+                yield records_to_frame(records)
+
+
+def read_hst(file, start=None, end=None, chunk_size=50000):
+    # Collects iter_hst chunks of a time range into one frame
+    frames = list(iter_hst(file, start, end, chunk_size))
+    if not frames:
+        return records_to_frame(np.empty(0, dtype=HST_RECORD))
+    return pd.concat(frames)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,146 @@
+
+################# LIBRARY IMPORTS ##################
+
+import numpy as np
+import pandas as pd
+
+################# Object IMPORTS ##################
+
+from tradex.market.bars import TIMEFRAMES, Bar
+
+OHLC = ['open', 'high', 'low', 'close']
+
+
+def epoch_seconds(index):
+    # DatetimeIndex (naive or tz aware) as int64 unix seconds
+    return np.asarray(index.values).astype('datetime64[s]').astype(np.int64)
+
+
+def forex_session(index):
+    """
+        Returns a boolean mask that is True for every timestamp in index
+        that falls inside the forex trading week, the market is treated
+        as closed from Friday 22:00 UTC till Sunday 22:00 UTC
+    """
+
+    day, hour = index.dayofweek, index.hour
+    closed = (
+        (day == 5) |
+        ((day == 4) & (hour >= 22)) |
+        ((day == 6) & (hour < 22))
+    )
+    return ~np.asarray(closed)
+
+
+def fill_gaps(frame, seconds=60, calendar=None):
+    """
+        Reindexes frame onto a regular grid of "seconds" spanning its first
+        and last index values, missing rows are added as NAN rows.
+
+        calendar is an optional callable receiving the DatetimeIndex of the
+        missing rows and returning a boolean mask of the ones that should
+        be filled (e.g forex_session), rows outside it are left out.
+
+        Returns a tuple of (filled frame, number of rows filled)
+    """
+
+    if len(frame) == 0:
+        return frame, 0
+
+    frame = frame.sort_index(axis=0)
+    frame = frame[~frame.index.duplicated(keep='last')]
+
+    grid = pd.date_range(
+        frame.index[0], frame.index[-1], freq=pd.Timedelta(seconds=seconds))
+    missing = grid[~grid.isin(frame.index)]
+
+    if calendar is not None and len(missing):
+        missing = missing[calendar(missing)]
+
+    if len(missing) == 0:
+        return frame, 0
+
+    return frame.reindex(frame.index.union(missing)), len(missing)
+
+
+def _reduce_buckets(stamps, columns, seconds):
+    # Aggregates sorted open,high,low,close columns into epoch aligned
+    # buckets of "seconds" with ufunc reduceat over the bucket boundaries,
+    # returns (bucket numbers, (n, 4) array) of the buckets holding rows
+    # only, so market closures give no bars. A bucket holding a nan open
+    # is all nan
+
+    o, h, l, c = columns
+    buckets = stamps // seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)]
+
+    high = np.fmax(np.fmax.reduceat(h, starts), np.fmax.reduceat(l, starts))
+    low = np.fmin(np.fmin.reduceat(h, starts), np.fmin.reduceat(l, starts))
+    values = np.column_stack([o[starts], high, low, c[ends - 1]])
+    values[np.logical_or.reduceat(np.isnan(o), starts)] = np.nan
+
+    return buckets[starts], values
+
+
+def resample_all(frame, timeframes=None):
+    """
+        Resamples an open,high,low,close frame (normally M1) into every
+        timeframe in "timeframes" (names from TIMEFRAMES or seconds),
+        every one of them is built straight from frame in one pass, no
+        timeframe is built from another one.
+
+        Only the buckets holding rows of frame are emitted, a gap in frame
+        (e.g the weekend, see fill_gaps) is a gap in every timeframe. A
+        resampled bar is nan if any of the rows it covers has a nan open,
+        its high/low are the max/min of both the high and low columns.
+
+        Returns dict of timeframe -> frame
+    """
+
+    timeframes = [x for x in TIMEFRAMES if x not in ('M1', 'D1')] \
+        if timeframes is None else timeframes
+
+    frame = frame.sort_index(axis=0)
+    stamps = epoch_seconds(frame.index)
+    columns = [frame[x].values.astype(np.float64) for x in OHLC]
+
+    resampled = {}
+    for name in timeframes:
+        seconds = TIMEFRAMES.get(name, name)
+
+        if len(frame) == 0:
+            resampled[name] = pd.DataFrame(
+                columns=OHLC, index=frame.index[:0], dtype=np.float64)
+            continue
+
+        buckets, values = _reduce_buckets(stamps, columns, seconds)
+        index = pd.to_datetime(buckets * seconds, unit='s')
+        if frame.index.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(frame.index.tz)
+        index.name = frame.index.name
+
+        resampled[name] = pd.DataFrame(values, index=index, columns=OHLC)
+
+    return resampled
+
+
+def resample_ohlc(frame, seconds):
+    # Single timeframe version of resample_all
+    return resample_all(frame, [seconds])[seconds]
+
+
+def bars_to_frame(bars):
+    # open,high,low,close frame (indexed by utc time) of a list of Bars
+    values = np.array(
+        [bar[:5] for bar in bars], dtype=np.float64).reshape(-1, 5)
+    index = pd.to_datetime(values[:, 0].astype(np.int64), unit='s')
+    index.name = 'time'
+    return pd.DataFrame(values[:, 1:], index=index, columns=OHLC)
+
+
+def frame_to_bars(frame):
+    # List of Bars of an open,high,low,close frame, tick counts are 0
+    stamps = epoch_seconds(frame.index).tolist()
+    columns = [frame[x].values.tolist() for x in OHLC]
+    return [Bar(t, o, h, l, c, 0) for t, o, h, l, c in zip(stamps, *columns)]
@@ -0,0 +1,209 @@
+
+################# REGULAR PYTHON IMPORTS ##################
+import time
+
+################# LIBRARY IMPORTS ##################
+
+import zmq
+
+################# Object IMPORTS ##################
+
+from tradex.config import MARKET_PAIRS, M_SUB_PORT, HOST_PUSH_PORT
+from tradex.market.buffers import TickStore
+from tradex.market.bars import BarBuilder, TIMEFRAMES
+from tradex.market.poller import EventLoop
+from tradex.market.wire import encode_bars, decode_ticks, KILL
+
+
+class SymbolStats:
+
+    """
+    Counters of one symbol, latency is the time between the connector
+    stamping a tick and the host folding it into its bar
+    """
+
+    __slots__ = ('ticks', 'bars', 'latency_total', 'latency_max')
+
+    def __init__(self):
+        self.ticks = 0
+        self.bars = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    @property
+    def latency_mean(self):
+        return self.latency_total / self.ticks if self.ticks else 0.0
+
+    def __repr__(self):
+        return (
+            f'<SymbolStats ticks={self.ticks} bars={self.bars} '
+            f'latency mean={self.latency_mean * 1000:.3f}ms '
+            f'max={self.latency_max * 1000:.3f}ms>')
+
+
+class Route:
+
+    # Per symbol state the dispatch table points to
+
+    __slots__ = ('symbol', 'ticks', 'bars', 'stats')
+
+    def __init__(self, symbol, tick_capacity):
+        self.symbol = symbol
+        self.ticks = TickStore(tick_capacity)
+        self.bars = BarBuilder(TIMEFRAMES['M1'])
+        self.stats = SymbolStats()
+
+
+class IngestionHost:
+
+    """
+    Ingestion of many market pairs in one process, replaces running one
+    MarketPair (context, push port and threads) per symbol.
+
+    A single SUB socket subscribes to every symbol topic, each tick is
+    routed through a dispatch table (topic -> Route) to the tick store
+    and streaming minute bar of its symbol, and every finished bar goes
+    out on one PUSH socket as a [symbol, bar frame] multipart message
+    (see market.wire). Both tick formats of MarketPair are understood.
+
+    A symbol's kill code is forwarded as [symbol, b'kill'] and drops
+    the symbol, the host stops once every symbol was killed.
+
+    [INIT VALUES]
+
+    1. pairs :== market pairs hosted, defaults to every configured pair
+
+    2. sub_port :== port of the tick publisher the SUB socket connects to
+
+    3. push_port :== port the PUSH socket of finished bars binds on
+
+    4. tick_capacity :== ticks kept per symbol in its ring buffer
+
+    """
+
+    def __init__(
+            self, pairs=MARKET_PAIRS, sub_port=None, push_port=HOST_PUSH_PORT,
+            string_delimiter=';', tick_capacity=2 ** 14, context=None):
+
+        self.sub_port = M_SUB_PORT if sub_port is None else sub_port
+        self.string_delimiter = string_delimiter
+
+        self.routes = {
+            pair.encode(): Route(pair, tick_capacity) for pair in pairs}
+        # kept apart from the routes so killed symbols are still reported
+        self.stats = {
+            route.symbol: route.stats for route in self.routes.values()}
+
+        self.context = context or zmq.Context()
+        self.push = self.context.socket(zmq.PUSH)
+        self.push.bind(f'tcp://*:{push_port}')
+        self.sub = None
+
+        self.loop = EventLoop()
+        self.started = None
+        self.malformed = 0
+
+    @property
+    def ticks(self):
+        return sum(stats.ticks for stats in self.stats.values())
+
+    @property
+    def throughput(self):
+        # Ticks per second since start()
+        if self.started is None:
+            return 0.0
+        elapsed = time.time() - self.started
+        return self.ticks / elapsed if elapsed else 0.0
+
+    def report(self):
+        lines = [f'{self.ticks} ticks, {self.throughput:.0f} ticks/sec']
+        lines.extend(
+            f'{symbol}: {stats!r}' for symbol, stats in self.stats.items()
+            if stats.ticks)
+        return '\n'.join(lines)
+
+    def start(self):
+        self.sub = self.context.socket(zmq.SUB)
+        self.sub.connect(f'tcp://localhost:{self.sub_port}')
+        for topic in self.routes:
+            self.sub.setsockopt(zmq.SUBSCRIBE, topic)
+
+        print('\n', f'\t\t ##### hosting {len(self.routes)} pairs #####')
+
+        self.started = time.time()
+        self.loop.register(self.sub, self.on_message)
+        try:
+            self.loop.run()
+        finally:
+            self.shutdown_sockets()
+
+    def stop(self):
+        self.loop.stop()
+
+    def shutdown_sockets(self):
+        if self.sub is not None:
+            self.sub.close()
+        self.push.close()
+        self.context.term()
+
+    def on_message(self, frames):
+        # Event loop handler, returns False once every symbol was killed
+        try:
+            self.handle_message(frames)
+        except ValueError:
+            self.malformed += 1
+        return bool(self.routes)
+
+    def handle_message(self, frames):
+        """
+            Routes one message of the sub socket, binary [SYMBOL, ticks]
+            or the legacy 'SYMBOL bid;ask;timestamp' string, to its symbol
+        """
+
+        if len(frames) == 2:
+            topic, payload = frames
+            route = self.routes.get(topic)
+            if route is None:
+                return
+            if payload == KILL:
+                return self.kill(topic)
+
+            ticks = decode_ticks(payload)
+            route.ticks.extend_ticks(ticks)
+            for stamp, bid in zip(
+                    ticks['time'].tolist(), ticks['bid'].tolist()):
+                self.on_tick(route, stamp, bid)
+            return
+
+        topic, _, data = frames[0].partition(b' ')
+        route = self.routes.get(topic)
+        if route is None:
+            return
+        if data == KILL:
+            return self.kill(topic)
+
+        _bid, _ask, _timestamp = data.decode().split(self.string_delimiter)
+        stamp, bid = float(_timestamp), float(_bid)
+
+        route.ticks.append(stamp, bid, float(_ask))
+        self.on_tick(route, stamp, bid)
+
+    def on_tick(self, route, timestamp, bid):
+        bar = route.bars.update(timestamp, bid)
+        if bar is not None:
+            self.push.send_multipart([route.symbol.encode(), encode_bars([bar])])
+            route.stats.bars += 1
+
+        stats = route.stats
+        latency = time.time() - timestamp
+        stats.ticks += 1
+        stats.latency_total += latency
+        if latency > stats.latency_max:
+            stats.latency_max = latency
+
+    def kill(self, topic):
+        route = self.routes.pop(topic)
+        print(f'Received killing code for {route.symbol}... dropping it')
+        self.push.send_multipart([topic, KILL])
+        if self.sub is not None:
+            self.sub.setsockopt(zmq.UNSUBSCRIBE, topic)
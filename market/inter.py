@@ -1,7 +1,7 @@
 
 ################# REGULAR PYTHON IMPORTS ##################
-import pickle
 import os
+import queue
 
 
 ################# LIBRARY IMPORTS ##################
@@ -12,7 +12,14 @@ import influxdb as db
 
 ################# Object IMPORTS ##################
 from tradex.market.base import MarketPair
-from tradex.market.fetch_history_hst import parse_hst
+from tradex.market.bars import TIMEFRAMES, Rollup
+from tradex.market.buffers import BarWindow
+from tradex.market.frames import fill_gaps, forex_session, resample_all, \
+    bars_to_frame, frame_to_bars, epoch_seconds
+from tradex.market.fetch_history_hst import parse_hst, read_hst
+from tradex.market.store import BarStore
+from tradex.market.writer import LineProtocolWriter, WriteBehindQueue
+from tradex.market.wire import decode_bars, records_to_bars, WireError
 from tradex.market.fetch_history_api import fetch_missing_data_fill_database
 from tradex.market.fetch_history_data import fetch_hist_data
 from influxdb.exceptions import InfluxDBClientError
@@ -23,11 +30,30 @@ from tradex.config import MT4_PATH
 
 class MarketParser(MarketPair):
 
-    def __init__(self, pair, router_port=None, sub_port=None):
+    # Lines per influx request and requests in flight when seeding bars
+    write_batch_size = 5000
+    write_workers = 4
+
+    # Newest bars of every timeframe, read as DataFrames
+    M1 = property(lambda self: self.windows['M1'].to_frame())
+    M5 = property(lambda self: self.windows['M5'].to_frame())
+    M15 = property(lambda self: self.windows['M15'].to_frame())
+    H1 = property(lambda self: self.windows['H1'].to_frame())
+    H4 = property(lambda self: self.windows['H4'].to_frame())
+    D1 = property(lambda self: self.windows['D1'].to_frame())
+
+    def __init__(self, pair, router_port=None, sub_port=None, lookback=500):
         super().__init__(
             pair=pair, router_port=router_port,
             sub_port=sub_port)
 
+        # fixed size rolling bar window per timeframe, holding "lookback"
+        # bars, see require_lookback for growing it
+        self.windows = {x: BarWindow(lookback) for x in TIMEFRAMES}
+
+        # live M5..D1 bars, rolled up from every finished M1 bar
+        self.rollup = Rollup()
+
         if not pair.startswith("frx"):
             self.database_name = pair
         else:
@@ -42,48 +68,109 @@ class MarketParser(MarketPair):
         self.client = db.DataFrameClient(
             host='localhost', port=8086, database=self.database_name)
 
+        # local columnar bar cache, read before influx on every cold start
+        self.store = BarStore(self.database_name)
+
+        self.writer = LineProtocolWriter(
+            self.client, self.database_name,
+            batch_size=self.write_batch_size, workers=self.write_workers)
+
+        # live bars are persisted behind the logic thread's back
+        self.write_behind = WriteBehindQueue(self.persist_bars)
+
+    def require_lookback(self, bars):
+        # Grows every bar window to hold at least "bars" bars, strategies
+        # and indicators call it with the longest lookback they read
+        for window in self.windows.values():
+            if window.capacity < bars:
+                window.resize(bars)
+
     def fill_and_return_resampled_data(self, frame):
-        m1 = super().fill_missing_indexes_values(frame)
-        m5 = super().resample_frame('5T', m1)
-        m15 = super().resample_frame('15T', m5)
-        h1 = super().resample_frame('1H', m15)
-        h4 = super().resample_frame('4H', h1)
+        m1, filled = fill_gaps(frame, TIMEFRAMES['M1'], forex_session)
+        print(f'Filled {filled} missing minutes for {self.database_name}')
 
-        for x in [m1, m5, m15, h1, h4]:
-            x.fillna(0, inplace=True)
+        # Every higher timeframe is built straight from M1 in one pass
+        r = dict(M1=m1)
+        r.update(resample_all(m1, ['M5', 'M15', 'H1', 'H4', 'D1']))
 
-        r = dict(M1=m1, M5=m5, M15=m15, H1=h1, H4=h4)
+        for x in r.values():
+            x.fillna(0, inplace=True)
 
         return r
 
+    def warm_frame(self, frame):
+        """
+            Returns the gap frame of a warm start joined with the stored
+            minutes of the day it starts in, so the M5..D1 bars the gap
+            reopens are rebuilt (and rewritten) whole, not from the gap
+            minutes only
+        """
+
+        if len(frame) == 0:
+            return frame
+
+        first = frame.index.min()
+        stored = self.store.read('M1', first.floor('D'), first)
+        if len(stored) == 0:
+            return frame
+        return pd.concat([stored, frame[stored.columns]])
+
+    def seed_windows(self, r):
+        """
+            Fills every bar window with its newest stored bars older than
+            the bars of r (timeframe -> frame about to be appended), so a
+            warm start holds the whole lookback and not the gap only
+        """
+
+        for key, window in self.windows.items():
+            stored = self.store.tail(key, window.capacity)
+            value = r.get(key)
+            if value is not None and len(value) and len(stored):
+                first = epoch_seconds(value.index[:1])[0]
+                stored = stored[epoch_seconds(stored.index) < first]
+            window.extend_frame(stored)
+
     def init(self, frame, modify=False):
+        if modify:
+            frame = self.warm_frame(frame)
         r = self.fill_and_return_resampled_data(frame)
+        if modify:
+            self.seed_windows(r)
 
         def loc(self):
             for key, value in r.items():
-                self.client.write_points(
-                    value,
-                    key,
-                    protocol='json'
-                )
-        if modify:
-            loc(self)
-            return
-        self.client.create_database(
-            f'{self.database_name}'
-        )
+                report = self.writer.write(value, key)
+                print(f'Wrote {key} of {self.database_name}: {report}')
+                self.store.write(key, value)
+                self.windows[key].extend_frame(value)
+
+        if not modify:
+            self.client.create_database(
+                f'{self.database_name}'
+            )
         loc(self)
 
+        # rebuild the open higher timeframe bars from the newest minutes
+        # (stored ones included on a warm start, see warm_frame), leaving
+        # out the gap rows that were filled with zeros
+        last_day = r['M1'].iloc[-TIMEFRAMES['D1'] // TIMEFRAMES['M1']:]
+        self.rollup.prime(frame_to_bars(last_day[last_day['open'] != 0]))
+
     def fetch_history_parse(self, year_val=None, range_1=None, range_2=None):
         """
             This method returns a dataframe containing parsed data from
             the imported parse_hst function and raises a FileNotFoundError
             if the path to the file does not exist....
+
+            Time ranges are read with read_hst, which seeks straight to
+            range_1 and only reads the records up to range_2
         """
 
         _path = os.path.join(MT4_PATH, self.pair_hst_file)
         if os.path.exists(_path):
-            return parse_hst(_path, year_val, range1=range_1, range2=range_2)
+            if range_1 is not None or range_2 is not None:
+                return read_hst(_path, range_1, range_2)
+            return parse_hst(_path, year_val)
 
         self.shutdown_sockets()
         raise FileNotFoundError(
@@ -95,9 +182,11 @@ class MarketParser(MarketPair):
         _now = pd.Timestamp.now('UTC')
 
         try:
-            _M1 = self.client.query(
-                f'select * from M1'
-            )[f'M1']
+            # only the newest stored minute is needed to resume from, the
+            # store is seeded from influx when it holds nothing yet
+            _M1 = self.store.tail('M1', 1)
+            if len(_M1) == 0:
+                _M1 = self.load_history('M1')
 
             _loop_frame = fetch_missing_data_fill_database(
                 self.database_name,
@@ -154,6 +243,47 @@ class MarketParser(MarketPair):
         finally:
             print("Done....")
 
+    def load_history(self, timeframe):
+        """
+            Returns the stored bars of timeframe, read from the local bar
+            store first, influx is only queried (and the store seeded from
+            it) when nothing was stored locally yet
+        """
+
+        frame = self.store.read(timeframe)
+        if len(frame):
+            return frame
+
+        frame = self.client.query(
+            f'select * from {timeframe}'
+        )[f'{timeframe}']
+        self.store.write(timeframe, frame)
+        return frame
+
+    def persist_bars(self, items):
+        """
+            Sink of the write-behind queue, receives a list of
+            (timeframe, Bar) items and writes them to influx and the
+            local bar store, one write per timeframe
+        """
+
+        grouped = {}
+        for timeframe, bar in items:
+            grouped.setdefault(timeframe, []).append(bar)
+
+        for timeframe, bars in grouped.items():
+            frame = bars_to_frame(bars)
+            self.writer.write(frame, timeframe)
+            self.store.append(timeframe, frame)
+
+    def queue_bar(self, timeframe, bar):
+        # Hands a finished bar to the write-behind queue without ever
+        # blocking the logic thread for longer than its max_lag
+        try:
+            self.write_behind.put((timeframe, bar))
+        except queue.Full:
+            print(f'Write-behind queue is full, {timeframe} bar not persisted')
+
     def get_history_metatrader(self):
         now = pd.Timestamp.utcnow()
         prev = now - pd.Timedelta(weeks=7)
@@ -192,34 +322,25 @@ class MarketParser(MarketPair):
         except Exception:
             pass
 
-    def validate_tick_crossing(self):
+    def validate_tick_crossing(self, bar):
         """
 
-        This method is called when the tick value in self.df_tick crosses the
-        minute mark....
-        It checks for all frames except M1 if their time mark has been passed,
-        creates a data range and then resamples the
-        1min data based on the range
-        to that frame's time,and appends returned
-        data to original
+        This method is called with every finished M1 bar, once the tick
+        value in self.df_tick crosses the minute mark....
+        It folds the bar into the open M5, M15, H1, H4 and D1 bars of the
+        rollup engine, every bar the minute closed is appended to its
+        timeframe's window and queued for persistence, nothing gets
+        resampled. Returns the list of (timeframe, Bar) closed
 
         """
 
-        pivot_time = self.M1.index[-1]
-        time_range = None
+        closed = self.rollup.update(bar)
 
-        for val in ['M5', 'M15']:
-            if pivot_time.minute in time_range[val]:
-                pass
+        for timeframe, finished in closed:
+            self.windows[timeframe].append_bar(finished)
+            self.queue_bar(timeframe, finished)
 
-        for valx in ['H1', 'H4']:
-            if pivot_time.hour in time_range[valx] and pivot_time.minute == 0:
-                pass
-
-        for valx in ['D1']:
-            if pivot_time.hour == 0 and pivot_time.minute == 0:
-                pass
-        pass
+        return closed
 
     """
 
@@ -251,21 +372,26 @@ class MarketParser(MarketPair):
         """
 
         print('\n', '\t\t ##### Polling for data on pull socket #####')
+        self.write_behind.start()
         while True:
             try:
                 msg = self.pull_socket.recv()
                 if msg != '':
                     if msg == b'kill':
                         print('killing logic thread... Killing now')
+                        self.write_behind.close()
                         self.shutdown_sockets()
                         raise ContextTerminated
-                    frame = pickle.loads(msg)
-                    self.M1 = self.M1.append(frame)
-                    print(self.M1.iloc[-1])
-                    # self.validate_tick_crossing()
+                    for bar in records_to_bars(decode_bars(msg)):
+                        self.windows['M1'].append_bar(bar)
+                        self.queue_bar('M1', bar)
+                        self.validate_tick_crossing(bar)
+                    print(self.windows['M1'].to_frame(1))
 
             except zmq.error.Again:
                 pass
+            except WireError as error:
+                print(f'Dropped malformed bar frame: {error}')
             except ValueError:
                 pass
             except KeyboardInterrupt:
@@ -0,0 +1,86 @@
+
+################# LIBRARY IMPORTS ##################
+
+import zmq
+
+
+class EventLoop:
+
+    """
+    Shared zmq.Poller based event loop for the socket consumers (market
+    pairs, strategies), replaces the recv(DONTWAIT) busy loops that kept a
+    core spinning while the market was idle. The process sleeps in poll()
+    until a registered socket is readable or the timeout expires.
+
+    Handlers are registered per socket and called with the frames of
+    every message received on it (recv_multipart), a handler returning
+    False stops the loop, which is how kill codes end it.
+
+    [INIT VALUES]
+
+    1. timeout :== milliseconds poll() waits before calling on_timeout
+    (and checking whether stop() was called from another thread)
+
+    2. batch :== maximum number of messages read from one socket before
+    the other sockets get their turn
+
+    """
+
+    def __init__(self, timeout=1000, batch=1000):
+        self.poller = zmq.Poller()
+        self.handlers = {}
+        self.timeout = timeout
+        self.batch = batch
+        self.running = False
+        self._timeout_callbacks = []
+
+    def register(self, socket, handler):
+        self.poller.register(socket, zmq.POLLIN)
+        self.handlers[socket] = handler
+
+    def unregister(self, socket):
+        self.poller.unregister(socket)
+        del self.handlers[socket]
+
+    def on_timeout(self, callback):
+        # callback() is called whenever poll() times out with nothing to read
+        self._timeout_callbacks.append(callback)
+
+    def stop(self):
+        # Safe to call from a handler or another thread
+        self.running = False
+
+    def _drain(self, socket):
+        handler = self.handlers[socket]
+        for _ in range(self.batch):
+            try:
+                frames = socket.recv_multipart(zmq.NOBLOCK)
+            except zmq.error.Again:
+                return
+            if handler(frames) is False:
+                self.running = False
+                return
+
+    def run(self):
+        """
+            Dispatches messages until a handler returns False, stop() is
+            called or the process is interrupted (KeyboardInterrupt)
+        """
+
+        self.running = True
+        try:
+            while self.running and self.handlers:
+                events = self.poller.poll(self.timeout)
+                if not events:
+                    for callback in self._timeout_callbacks:
+                        callback()
+                    continue
+
+                for socket, _ in events:
+                    self._drain(socket)
+                    if not self.running:
+                        break
+        except KeyboardInterrupt:
+            print('Interrupted... stopping event loop')
+        finally:
+            self.running = False
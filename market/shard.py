@@ -0,0 +1,218 @@
+
+################# REGULAR PYTHON IMPORTS ##################
+import multiprocessing
+import os
+import time
+import zlib
+from collections import Counter
+from threading import Thread
+
+################# LIBRARY IMPORTS ##################
+
+import zmq
+
+################# Object IMPORTS ##################
+
+from tradex.config import MARKET_PAIRS, M_SUB_PORT, HOST_PUSH_PORT, \
+    SHARD_BASE_PORT
+from tradex.market.host import IngestionHost
+
+
+def shard_of(symbol, shards):
+    # Stable shard index of a symbol, the same on every run and machine
+    # (unlike hash(), which is salted per process)
+    return zlib.crc32(symbol.encode()) % shards
+
+
+def assign(pairs, shards):
+    # List of the pairs of every shard, in the order pairs were given
+    placement = [[] for _ in range(shards)]
+    for pair in pairs:
+        placement[shard_of(pair, shards)].append(pair)
+    return placement
+
+
+def run_shard(pairs, feed_port, push_port):
+    # Worker process: one ingestion host for the pairs of a shard
+    host = IngestionHost(pairs, sub_port=feed_port, push_port=push_port)
+    host.start()
+    print(host.report())
+
+
+def _proxy(frontend, backend):
+    # Runs zmq.proxy until the context is terminated
+    try:
+        zmq.proxy(frontend, backend)
+    except zmq.error.ContextTerminated:
+        pass
+    finally:
+        frontend.close()
+        backend.close()
+
+
+class ShardSupervisor:
+
+    """
+    Spreads ingestion of the market pairs over several worker processes
+    (one IngestionHost each) so every core of the box can be used.
+
+    Pairs are placed on shards by a crc32 hash of their name, a restarted
+    worker gets exactly the same pairs back. The supervisor forwards the
+    xpub tick feed to the workers through an XSUB/XPUB proxy, merges the
+    [symbol, bar frame] outputs of every worker into one PUSH socket and
+    restarts any worker that dies with a non-zero exit code, after
+    restart_delay seconds doubling with every crash in a row (up to
+    max_delay). A shard crashing max_restarts times in a row is given up
+    on, a worker that ran for max_delay seconds starts counting again. A
+    worker exiting cleanly (every pair killed) is not restarted, the
+    supervisor returns once no worker is left.
+
+    [INIT VALUES]
+
+    1. pairs :== market pairs ingested, defaults to every configured pair
+
+    2. shards :== number of worker processes, defaults to the cpu count
+
+    3. sub_port :== port of the upstream tick publisher
+
+    4. push_port :== port the merged bar output binds on
+
+    5. base_port :== the feed binds on base_port, worker n pushes its
+    bars on base_port + 1 + n
+
+    6. restart_delay, max_delay, max_restarts :== restart backoff, see
+    above
+
+    """
+
+    def __init__(
+            self, pairs=MARKET_PAIRS, shards=None, sub_port=None,
+            push_port=HOST_PUSH_PORT, base_port=SHARD_BASE_PORT,
+            check_interval=1.0, restart_delay=1.0, max_delay=60.0,
+            max_restarts=5):
+
+        self.shards = shards or os.cpu_count() or 1
+        self.placement = assign(pairs, self.shards)
+        self.sub_port = M_SUB_PORT if sub_port is None else sub_port
+        self.push_port = push_port
+        self.base_port = base_port
+        self.check_interval = check_interval
+        self.restart_delay = restart_delay
+        self.max_delay = max_delay
+        self.max_restarts = max_restarts
+
+        # spawn, so workers never inherit the supervisor's zmq context
+        self._mp = multiprocessing.get_context('spawn')
+        self.processes = {}
+        # crashes in a row of every shard, and when crashed ones restart
+        self.restarts = Counter()
+        self.pending = {}
+        self._started = {}
+        self.context = None
+        self.running = False
+
+    def worker_port(self, index):
+        return self.base_port + 1 + index
+
+    def spawn(self, index):
+        process = self._mp.Process(
+            target=run_shard, name=f'shard-{index}', daemon=True, args=(
+                self.placement[index], self.base_port,
+                self.worker_port(index)))
+        process.start()
+        self.processes[index] = process
+        self.pending.pop(index, None)
+        self._started[index] = time.time()
+        return process
+
+    def _socket(self, kind):
+        # messages still queued when stop() terminates the context are
+        # dropped, term() would otherwise wait for them forever
+        socket = self.context.socket(kind)
+        socket.setsockopt(zmq.LINGER, 0)
+        return socket
+
+    def _bind(self):
+        self.context = zmq.Context()
+
+        xsub = self._socket(zmq.XSUB)
+        xsub.connect(f'tcp://localhost:{self.sub_port}')
+        xpub = self._socket(zmq.XPUB)
+        xpub.bind(f'tcp://*:{self.base_port}')
+
+        pull = self._socket(zmq.PULL)
+        for index, pairs in enumerate(self.placement):
+            if pairs:
+                pull.connect(f'tcp://localhost:{self.worker_port(index)}')
+        push = self._socket(zmq.PUSH)
+        push.bind(f'tcp://*:{self.push_port}')
+
+        self._threads = [
+            Thread(target=_proxy, args=(xsub, xpub), daemon=True),
+            Thread(target=_proxy, args=(pull, push), daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def check(self):
+        # Restarts crashed workers once their delay is over, forgets the
+        # ones that exited cleanly
+        now = time.time()
+        for index, due in list(self.pending.items()):
+            if now >= due:
+                self.spawn(index)
+
+        for index, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            del self.processes[index]
+            if process.exitcode == 0:
+                continue
+
+            pairs = ", ".join(self.placement[index])
+            if now - self._started[index] >= self.max_delay:
+                self.restarts[index] = 0
+            if self.restarts[index] >= self.max_restarts:
+                print(
+                    f'Shard {index} died ({process.exitcode}) '
+                    f'{self.restarts[index] + 1} times in a row, giving up '
+                    f'on {pairs}')
+                continue
+
+            delay = min(
+                self.restart_delay * 2 ** self.restarts[index],
+                self.max_delay)
+            self.restarts[index] += 1
+            print(
+                f'Shard {index} died ({process.exitcode}), restarting '
+                f'{pairs} in {delay:.1f}s')
+            self.pending[index] = now + delay
+
+    def start(self):
+        self._bind()
+        for index, pairs in enumerate(self.placement):
+            if pairs:
+                self.spawn(index)
+
+        print('\n', f'\t\t ##### {len(self.processes)} shards running #####')
+
+        self.running = True
+        try:
+            while self.running and (self.processes or self.pending):
+                time.sleep(self.check_interval)
+                self.check()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.running = False
+        for process in self.processes.values():
+            process.terminate()
+            process.join()
+        self.processes.clear()
+        self.pending.clear()
+        if self.context is not None:
+            self.context.term()
+            self.context = None
@@ -0,0 +1,227 @@
+
+################# REGULAR PYTHON IMPORTS ##################
+import os
+import shutil
+
+################# LIBRARY IMPORTS ##################
+
+import numpy as np
+import pandas as pd
+
+################# Object IMPORTS ##################
+
+from tradex.config import BAR_STORE_PATH
+from tradex.market.frames import epoch_seconds, OHLC
+
+DAY = 24 * 60 * 60
+
+COLUMNS = ['time'] + OHLC
+
+
+def to_seconds(value):
+    # Unix seconds of a timestamp like value, naive values are taken as utc
+    if value is None or isinstance(value, (int, float, np.number)):
+        return value
+    stamp = pd.Timestamp(value)
+    if stamp.tz is None:
+        stamp = stamp.tz_localize('UTC')
+    return stamp.value // 10 ** 9
+
+
+class BarStore:
+
+    """
+    Local columnar bar cache of a market pair, sits in front of InfluxDB.
+
+    Bars of every timeframe are kept in one file per utc day,
+    <root>/<pair>/<timeframe>/<YYYY-MM-DD>.npy, each file is a (5, n)
+    float64 array whose rows are the time (unix seconds), open, high,
+    low and close columns. Files are memory mapped on read, so a cold
+    start only touches the days it actually asks for.
+
+    Live bars newer than the last bar of their day are appended to a
+    <YYYY-MM-DD>.tail side file of raw (time, open, high, low, close)
+    float64 records instead, so a write-behind flush costs the bars it
+    writes, not the bars of the day. Reads join both files, write()
+    merges the tail back into the day file.
+
+    [INIT VALUES]
+
+    1. pair :== database name of the market pair (EURUSD, not frxEURUSD)
+
+    2. root :== directory holding the stores of every pair
+
+    """
+
+    def __init__(self, pair, root=BAR_STORE_PATH):
+        self.pair = pair
+        self.root = os.path.join(root, pair)
+
+    def path(self, timeframe, day):
+        day = pd.Timestamp(int(day) * DAY, unit='s').strftime('%Y-%m-%d')
+        return os.path.join(self.root, timeframe, f'{day}.npy')
+
+    def tail_path(self, timeframe, day):
+        return self.path(timeframe, day)[:-4] + '.tail'
+
+    def days(self, timeframe):
+        # Sorted day numbers (days since epoch) stored for a timeframe
+        folder = os.path.join(self.root, timeframe)
+        if not os.path.isdir(folder):
+            return []
+        return sorted({
+            int(pd.Timestamp(x.split('.')[0]).value // 10 ** 9) // DAY
+            for x in os.listdir(folder)
+            if x.endswith('.npy') or x.endswith('.tail')})
+
+    def _load(self, timeframe, day):
+        path = self.path(timeframe, day)
+        values = np.load(path, mmap_mode='r') if os.path.exists(path) \
+            else np.empty((len(COLUMNS), 0))
+
+        tail = self.tail_path(timeframe, day)
+        if not os.path.exists(tail):
+            return values
+
+        # whole records only (a crash may cut the last one short), and
+        # only the ones a merge did not already put in the day file
+        records = np.fromfile(tail, dtype=np.float64)
+        records = records[:len(records) // len(COLUMNS) * len(COLUMNS)]
+        records = records.reshape(-1, len(COLUMNS)).T
+        if values.shape[1]:
+            records = records[:, records[0] > values[0, -1]]
+        return np.hstack([values, records])
+
+    def _last(self, timeframe, day):
+        # Time of the newest bar of a day, read without loading the day
+        last = -np.inf
+        path = self.path(timeframe, day)
+        if os.path.exists(path):
+            values = np.load(path, mmap_mode='r')
+            if values.shape[1]:
+                last = values[0, -1]
+
+        tail = self.tail_path(timeframe, day)
+        size = os.path.getsize(tail) if os.path.exists(tail) else 0
+        record = len(COLUMNS) * 8
+        if size >= record:
+            with open(tail, 'rb') as fp:
+                fp.seek(size // record * record - record)
+                last = max(last, np.frombuffer(fp.read(8), np.float64)[0])
+        return last
+
+    def write(self, timeframe, frame):
+        """
+            Merges the bars of frame into the stored days of timeframe,
+            bars already stored at the same time are replaced
+        """
+
+        if len(frame) == 0:
+            return
+
+        stamps = epoch_seconds(frame.index).astype(np.float64)
+        values = np.vstack(
+            [stamps] + [frame[x].values.astype(np.float64) for x in OHLC])
+        days = stamps // DAY
+
+        os.makedirs(os.path.join(self.root, timeframe), exist_ok=True)
+
+        for day in np.unique(days):
+            merged = np.hstack(
+                [self._load(timeframe, day), values[:, days == day]])
+
+            # keep the newest copy of every bar, np.unique also sorts them
+            _, idx = np.unique(merged[0, ::-1], return_index=True)
+            merged = merged[:, merged.shape[1] - 1 - idx]
+
+            path = self.path(timeframe, day)
+            with open(path + '.tmp', 'wb') as fp:
+                np.save(fp, merged)
+            os.replace(path + '.tmp', path)
+
+            # the tail is in the day file now
+            tail = self.tail_path(timeframe, day)
+            if os.path.exists(tail):
+                os.remove(tail)
+
+    def append(self, timeframe, frame):
+        """
+            Appends the bars of frame to the tail files of their days when
+            they are all newer than the last bar of that day, the days they
+            are not (a bar replaced, bars out of order) are merged with
+            write()
+        """
+
+        if len(frame) == 0:
+            return
+
+        stamps = epoch_seconds(frame.index).astype(np.float64)
+        values = np.vstack(
+            [stamps] + [frame[x].values.astype(np.float64) for x in OHLC])
+        days = stamps // DAY
+
+        os.makedirs(os.path.join(self.root, timeframe), exist_ok=True)
+
+        for day in np.unique(days):
+            new = values[:, days == day]
+            last = self._last(timeframe, day)
+            if new[0, 0] > last and (np.diff(new[0]) > 0).all():
+                tail = self.tail_path(timeframe, day)
+                record = len(COLUMNS) * 8
+                size = os.path.getsize(tail) if os.path.exists(tail) else 0
+                if size % record:
+                    # drops a record cut short by a crash
+                    os.truncate(tail, size - size % record)
+                with open(tail, 'ab') as fp:
+                    fp.write(np.ascontiguousarray(new.T).tobytes())
+            else:
+                self.write(timeframe, frame[days == day])
+
+    def _frame(self, arrays):
+        values = np.hstack(arrays) if arrays else \
+            np.empty((len(COLUMNS), 0))
+        index = pd.to_datetime(values[0].astype(np.int64), unit='s')
+        index = index.tz_localize('UTC')
+        index.name = 'time'
+        return pd.DataFrame(
+            {x: values[i + 1] for i, x in enumerate(OHLC)},
+            index=index, columns=OHLC)
+
+    def read(self, timeframe, start=None, end=None):
+        """
+            Returns the stored bars of timeframe with start <= time <= end
+            (unix seconds or anything pd.Timestamp accepts) as a frame
+            indexed by utc time, empty if nothing is stored
+        """
+
+        start, end = to_seconds(start), to_seconds(end)
+
+        arrays = []
+        for day in self.days(timeframe):
+            if start is not None and (day + 1) * DAY <= start:
+                continue
+            if end is not None and day * DAY > end:
+                break
+            values = self._load(timeframe, day)
+            left = 0 if start is None else \
+                values[0].searchsorted(start, 'left')
+            right = values.shape[1] if end is None else \
+                values[0].searchsorted(end, 'right')
+            arrays.append(values[:, left:right])
+
+        return self._frame(arrays)
+
+    def tail(self, timeframe, n):
+        # Returns the newest n stored bars of timeframe
+        arrays, count = [], 0
+        for day in reversed(self.days(timeframe)):
+            values = self._load(timeframe, day)
+            arrays.insert(0, values[:, max(values.shape[1] - n + count, 0):])
+            count += arrays[0].shape[1]
+            if count >= n:
+                break
+        return self._frame(arrays)
+
+    def drop(self):
+        # Removes every stored bar of the pair
+        shutil.rmtree(self.root, ignore_errors=True)
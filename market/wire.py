@@ -0,0 +1,112 @@
+
+################# REGULAR PYTHON IMPORTS ##################
+import struct
+
+################# LIBRARY IMPORTS ##################
+
+import numpy as np
+
+################# Object IMPORTS ##################
+
+from tradex.market.bars import Bar
+
+
+class WireError(ValueError):
+    pass
+
+
+# BAR FRAMES :== fixed layout binary messages carrying one or more
+# finished bars over the internal PUSH/PULL pipe
+#
+#   header  : 4 byte magic b'TXB1' + uint32 number of bars
+#   records : per bar int64 time (unix seconds), float64 open, high,
+#             low, close and int64 tick count, all little endian
+
+BAR_MAGIC = b'TXB1'
+BAR_HEADER = struct.Struct('<4sI')
+
+BAR_RECORD = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('ticks', '<i8'),
+])
+
+
+def encode_bars(bars):
+    # Packs an iterable of Bars (or bar tuples), or a BAR_RECORD array,
+    # into one bar frame, the records are laid out by NumPy in one go
+    if not isinstance(bars, np.ndarray):
+        bars = list(bars)
+    records = np.asarray(bars, dtype=BAR_RECORD)
+    return BAR_HEADER.pack(BAR_MAGIC, len(records)) + records.tobytes()
+
+
+def decode_bars(buffer):
+    """
+        Returns the bars of a bar frame as a read only BAR_RECORD array
+        viewing the buffer (no copy). The header and length are checked
+        before anything is read, anything malformed raises WireError
+    """
+
+    view = memoryview(buffer)
+    if view.nbytes < BAR_HEADER.size:
+        raise WireError("Bar frame is shorter than its header")
+
+    magic, count = BAR_HEADER.unpack_from(view)
+    if magic != BAR_MAGIC:
+        raise WireError("Not a bar frame, wrong magic bytes")
+    if view.nbytes != BAR_HEADER.size + count * BAR_RECORD.itemsize:
+        raise WireError("Bar frame length does not match its bar count")
+
+    return np.frombuffer(
+        view, dtype=BAR_RECORD, count=count, offset=BAR_HEADER.size)
+
+
+def records_to_bars(records):
+    # List of Bars of a BAR_RECORD array
+    return [Bar(*x) for x in records.tolist()]
+
+
+# TICK MESSAGES :== multipart [topic, payload] messages carrying ticks of
+# one symbol from the connector's PUB socket to the market pairs
+#
+#   topic   : symbol name, e.g b'EURUSD', used for subscription
+#   payload : one or more records of float64 bid, ask and timestamp
+#             (unix seconds), little endian, or b'kill'
+
+KILL = b'kill'
+
+TICK_STRUCT = struct.Struct('<3d')
+
+TICK_RECORD = np.dtype([
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('time', '<f8'),
+])
+
+
+def encode_tick(symbol, bid, ask, timestamp):
+    # Multipart frames of a single tick
+    return [symbol.encode(), TICK_STRUCT.pack(bid, ask, timestamp)]
+
+
+def encode_ticks(symbol, ticks):
+    # Multipart frames of several (bid, ask, timestamp) ticks of a symbol
+    return [symbol.encode(), b''.join(TICK_STRUCT.pack(*x) for x in ticks)]
+
+
+def decode_ticks(payload):
+    """
+        Returns the ticks of a tick payload as a read only TICK_RECORD
+        array viewing the payload (no copy), raises WireError if its
+        length is not a whole number of records
+    """
+
+    view = memoryview(payload)
+    if view.nbytes == 0 or view.nbytes % TICK_RECORD.itemsize:
+        raise WireError("Tick payload length is not a whole number of ticks")
+
+    return np.frombuffer(view, dtype=TICK_RECORD)
@@ -0,0 +1,261 @@
+
+################# REGULAR PYTHON IMPORTS ##################
+import queue
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+
+################# LIBRARY IMPORTS ##################
+
+import numpy as np
+
+################# Object IMPORTS ##################
+
+from tradex.market.frames import epoch_seconds, OHLC
+
+
+class WriteReport(namedtuple('WriteReport', ['rows', 'batches', 'seconds'])):
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else float('inf')
+
+    def __str__(self):
+        return (
+            f'{self.rows} rows in {self.batches} batches, '
+            f'{self.seconds:.3f}s ({self.rows_per_second:.0f} rows/sec)')
+
+
+def to_line_protocol(frame, measurement, columns=OHLC):
+    """
+        Serializes a frame of bars into a list of influx line protocol
+        lines with second precision timestamps, e.g
+
+            M1 open=1.1,high=1.2,low=1.0,close=1.15 1568000000
+
+        Columns are converted as whole arrays, rows holding a nan are
+        dropped since line protocol has no way to write one
+    """
+
+    values = np.column_stack(
+        [frame[x].values.astype(np.float64) for x in columns])
+    stamps = epoch_seconds(frame.index)
+
+    keep = ~np.isnan(values).any(axis=1)
+    if not keep.all():
+        values, stamps = values[keep], stamps[keep]
+
+    template = measurement + ' ' + ','.join(
+        f'{x}=%r' for x in columns) + ' %d'
+
+    return [
+        template % row for row in zip(*values.T.tolist(), stamps.tolist())
+    ]
+
+
+class LineProtocolWriter:
+
+    """
+    Writes bars to influx as line protocol, in bounded batches that are
+    sent concurrently over the client's pooled HTTP session.
+
+    [INIT VALUES]
+
+    1. client :== influx client (DataFrameClient or InfluxDBClient),
+    its session pool (pool_size) should be at least "workers" large
+
+    2. database :== database written to, defaults to the client's one
+
+    3. batch_size :== maximum number of lines sent in one request
+
+    4. workers :== number of batches in flight at the same time
+
+    """
+
+    def __init__(self, client, database=None, batch_size=5000, workers=4):
+        self.client = client
+        self.database = database
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def _send(self, batch):
+        params = {'precision': 's'}
+        database = self.database or self.client._database
+        if database:
+            params['db'] = database
+
+        self.client.write(
+            batch, params=params, expected_response_code=204,
+            protocol='line')
+
+    def write_lines(self, lines):
+        start = time.time()
+        batches = [
+            lines[x:x + self.batch_size]
+            for x in range(0, len(lines), self.batch_size)
+        ]
+
+        if len(batches) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(self.workers) as pool:
+                # list() re-raises the first failed batch
+                list(pool.map(self._send, batches))
+        else:
+            for batch in batches:
+                self._send(batch)
+
+        return WriteReport(len(lines), len(batches), time.time() - start)
+
+    def write(self, frame, measurement):
+        # Serializes and writes a frame of bars, returns a WriteReport
+        start = time.time()
+        report = self.write_lines(to_line_protocol(frame, measurement))
+        return report._replace(seconds=time.time() - start)
+
+
+class WriteBehindQueue:
+
+    """
+    Write-behind queue for live bars, the logic thread only enqueues and
+    a background thread hands batches of queued items to "sink".
+
+    A batch is flushed every flush_interval seconds or as soon as
+    batch_size items are waiting, whichever comes first, so a crash loses
+    at most one flush interval of bars. A failing sink keeps its batch,
+    the writer thread then stops draining the queue and retries the
+    batch with exponential backoff (flush_interval doubling up to
+    max_backoff), so a full queue makes put() block and give up.
+
+    [INIT VALUES]
+
+    1. sink :== callable receiving a list of queued items
+
+    2. flush_interval :== seconds between two flushes
+
+    3. batch_size :== number of waiting items that forces a flush
+
+    4. max_pending :== size of the queue and of the batch held by the
+    writer thread, put() blocks (backpressure) once that many items are
+    waiting in the queue
+
+    5. max_lag :== longest put() is allowed to block on a full queue
+    before it gives up and raises queue.Full
+
+    6. max_backoff :== longest wait between two retries of a failing sink
+
+    """
+
+    _STOP = object()
+
+    def __init__(
+            self, sink, flush_interval=1.0, batch_size=500,
+            max_pending=10000, max_lag=0.5, max_backoff=30.0):
+
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.max_lag = max_lag
+        self.max_backoff = max_backoff
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = []
+        self._oldest = None
+        self._thread = None
+        self._closing = Event()
+        # seconds until the next retry of a failing sink, 0 when healthy
+        self._backoff = 0.0
+
+        self.written = 0
+        self.failures = 0
+
+    @property
+    def lag(self):
+        # Seconds the oldest unwritten item has been waiting
+        oldest = self._oldest
+        return 0.0 if oldest is None else time.time() - oldest
+
+    def start(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def put(self, item):
+        self._queue.put(item, timeout=self.max_lag)
+
+    def close(self, timeout=None):
+        # Flushes whatever is still queued and stops the writer thread, a
+        # sink still failing then gets one last retry
+        if self._thread is not None:
+            self._closing.set()
+            try:
+                self._queue.put_nowait(self._STOP)
+            except queue.Full:
+                # the writer thread stops once it drained the queue
+                pass
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _flush(self):
+        # Hands the pending batch to the sink, returns False if it failed
+        if not self._pending:
+            return True
+        try:
+            self.sink(self._pending)
+        except Exception as ex:
+            self.failures += 1
+            self._backoff = min(
+                self._backoff * 2 or self.flush_interval, self.max_backoff)
+            print(
+                f'Write-behind flush failed, retrying in '
+                f'{self._backoff:.2f}s: {ex!r}')
+            return False
+
+        self.written += len(self._pending)
+        self._pending = []
+        self._oldest = None
+        self._backoff = 0.0
+        return True
+
+    def _run(self):
+        deadline = time.time() + self.flush_interval
+        stop = False
+
+        while True:
+            if self._backoff:
+                # the sink is down, nothing more is taken off the queue
+                # (put() blocks once it is full) until the batch is written
+                closing = self._closing.wait(self._backoff)
+                if self._flush():
+                    deadline = time.time() + self.flush_interval
+                elif closing:
+                    print(
+                        f'Write-behind closed, {len(self._pending)} '
+                        f'items were not written')
+                    return
+                continue
+
+            if stop:
+                return
+
+            if len(self._pending) < self.max_pending:
+                try:
+                    item = self._queue.get(
+                        timeout=max(deadline - time.time(), 0))
+                    if item is self._STOP:
+                        stop = True
+                    else:
+                        if self._oldest is None:
+                            self._oldest = time.time()
+                        self._pending.append(item)
+                except queue.Empty:
+                    stop = self._closing.is_set()
+
+            if (
+                stop or len(self._pending) >= self.batch_size or
+                len(self._pending) >= self.max_pending or
+                time.time() >= deadline
+            ):
+                self._flush()
+                deadline = time.time() + self.flush_interval
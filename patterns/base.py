@@ -1,6 +1,13 @@
 import numpy as np
 
 
+def direction(open_x, close):
+    """ BasePattern.f over whole arrays, as int8 -1 Bearish, 1 Bullish
+    and 0 Indecisive, bars with a nan open or close are 0 as well """
+
+    return (open_x < close).astype(np.int8) - (open_x > close).astype(np.int8)
+
+
 class BasePattern:
 
     DIRECTION = (("Bearish", -1), ("Bullish", 1), ("Indecisive", 0))
@@ -24,10 +31,15 @@ class BasePattern:
 
     columns = ['open', 'high', 'low', 'close']
 
+    # bars a signal looks at, the signal of a bar only depends on it and
+    # the span - 1 bars before it (see patterns.stream)
+    span = 1
+
     def __init__(self, array_x):
         try:
             self.df = array_x[self.columns].values
-        except AttributeError:
+        except (AttributeError, IndexError):
+            # numpy arrays can not be indexed by column names
             try:
                 assert type(array_x) == np.ndarray
                 assert len(array_x.shape) == 2
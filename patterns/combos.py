@@ -1,14 +1,125 @@
+import functools
+
 import talib
 import numpy as np
 
 
+class UndeclaredPrimitive(LookupError):
+    pass
+
+
+def uses(*primitives):
+    """ Declares the TA-Lib candle functions (CDL...) a combo reads
+    through Base.primitive(), so that Base.scan() can compute each of
+    them once for every combo it runs. The declaration is the only
+    list, while the combo runs primitive() refuses any other name """
+
+    def decorate(combo):
+        @functools.wraps(combo)
+        def run(self, *args, **kwargs):
+            outer, self._declared = self._declared, primitives
+            try:
+                return combo(self, *args, **kwargs)
+            finally:
+                self._declared = outer
+        run.primitives = primitives
+        return run
+    return decorate
+
+
 class Base:
-    def __init__(self, array, indicator_array=None, indicator_list=None):
+
+    """
+    Combos of candlestick patterns over an (n, 4) open,high,low,close
+    array, each combo method reads TA-Lib candle functions (primitives)
+    through primitive() which computes each of them once per array.
+
+    [INIT VALUES]
+
+    1. array :== (n, 4) open,high,low,close array
+
+    2. indicator_array / indicator_list :== indicator values some combos
+    compare the bars to
+
+    3. primitives :== dict of primitives already computed over that very
+    array, shared instead of recomputed (e.g. between two Base)
+
+    Methods:
+
+        primitive(name) : >>> Returns talib.<name> over the array, only
+        computed on the first request, raises UndeclaredPrimitive when
+        the running combo did not declare it in @uses
+
+        scan(names) : >>> Runs the combos named (every combo by default)
+        after computing the union of their primitives once
+
+    """
+
+    def __init__(
+            self, array, indicator_array=None, indicator_list=None,
+            primitives=None):
 
         self.array = array
         self.iarray = indicator_array
         self.ilist = indicator_list
         self.o, self.h, self.l, self.c = self.get_ohlc(array)
+        self.primitives = {} if primitives is None else primitives
+
+    # primitives the running combo declared, None outside of a combo
+    _declared = None
+
+    def primitive(self, name):
+        if self._declared is not None and name not in self._declared:
+            raise UndeclaredPrimitive(
+                f"{name} is not in the @uses of the running combo "
+                f"{self._declared}")
+        if name not in self.primitives:
+            value = getattr(talib, name)(self.o, self.h, self.l, self.c)
+            # shared between combos, none of them may change it
+            value.setflags(write=False)
+            self.primitives[name] = value
+        return self.primitives[name]
+
+    @classmethod
+    def combos(cls):
+        # names of the combo methods, the ones declared with @uses
+        return [
+            x for x in dir(cls)
+            if hasattr(getattr(cls, x), 'primitives')]
+
+    @classmethod
+    def requires(cls, names=None):
+        # distinct primitives the combos named depend on, in first use order
+        needed = []
+        for name in cls.combos() if names is None else names:
+            for x in getattr(cls, name).primitives:
+                if x not in needed:
+                    needed.append(x)
+        return needed
+
+    def scan(self, names=None):
+        """
+            Returns {combo name: result} of the combos named (all of them
+            by default). Every primitive they depend on is computed once
+            up front and shared, so running the whole catalogue costs
+            about the distinct primitives. A combo that raises is printed
+            and gives None, except on a primitive missing from its @uses
+        """
+
+        names = self.combos() if names is None else list(names)
+        for x in self.requires(names):
+            self.primitive(x)
+
+        results = {}
+        for name in names:
+            try:
+                results[name] = getattr(self, name)()
+            except UndeclaredPrimitive:
+                raise
+            except Exception as e:
+                print(f"Combo {name} failed: {e!r}")
+                results[name] = None
+        return results
 
     def check_status(self, open_x, close):
         if open_x > close:
@@ -24,6 +135,7 @@ class Base:
     def get_size(self, open, close):
         return abs(open - close)
 
+    @uses('CDLMARUBOZU', 'CDLGRAVESTONEDOJI')
     def bear_marubozu_gravestone(self, *args):
         def logic(r):
             if (
@@ -35,8 +147,8 @@ class Base:
                 return 1
             return 0
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        grave = talib.CDLGRAVESTONEDOJI(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        grave = self.primitive('CDLGRAVESTONEDOJI')
 
         try:
             loc, loc2 = np.where(mar == -100)[0], np.where(grave == 100)[0]
@@ -54,6 +166,7 @@ class Base:
                 r = i[-2:]
                 return logic(r)
 
+    @uses('CDLENGULFING')
     def bear_engulfing_touch(self, *args):
         def logic(idx):
             if (
@@ -64,7 +177,7 @@ class Base:
                 return 1
             return 0
 
-        engulf = talib.CDLENGULFING(self.o, self.h, self.l, self.c)
+        engulf = self.primitive('CDLENGULFING')
 
         try:
             idx = np.where(engulf == -100)[0]
@@ -76,6 +189,7 @@ class Base:
             if self.ilist is None:
                 return logic(idx)
 
+    @uses('CDLHAMMER', 'CDLINVERTEDHAMMER')
     def bear_hammer_inverse(self, *args):
         def logic(x):
             nonlocal o
@@ -90,8 +204,8 @@ class Base:
             ):
                 o.append(x)
 
-        ham = talib.CDLHAMMER(self.o, self.h, self.l, self.c)
-        t = talib.CDLINVERTEDHAMMER(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLHAMMER')
+        t = self.primitive('CDLINVERTEDHAMMER')
         idx = np.where(ham == 100)[0]
         idx1 = np.where(t == 100)[0]
 
@@ -106,6 +220,7 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLHAMMER', 'CDLINVERTEDHAMMER')
     def bear_marubozu_dragonfly_gravestone(self, *args):
         def logic(x):
             nonlocal o
@@ -120,8 +235,8 @@ class Base:
             ):
                 o.append(x)
 
-        ham = talib.CDLHAMMER(self.o, self.h, self.l, self.c)
-        t = talib.CDLINVERTEDHAMMER(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLHAMMER')
+        t = self.primitive('CDLINVERTEDHAMMER')
         idx = np.where(ham == 100)[0]
         idx1 = np.where(t == 100)[0]
 
@@ -135,10 +250,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLDRAGONFLYDOJI')
     def bull_marubozu_dragonfly(self, *args):
 
-        ham = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        dra = talib.CDLDRAGONFLYDOJI(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLMARUBOZU')
+        dra = self.primitive('CDLDRAGONFLYDOJI')
 
         idx = np.where(ham == 100)[0]
         idx2 = np.where(dra == 100)[0]
@@ -154,15 +270,17 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLENGULFING')
     def bull_engulfing_touch(self, *args):
-        eng = talib.CDLENGULFING(self.o, self.h, self.l, self.c)
+        eng = self.primitive('CDLENGULFING')
         idx = np.where(eng == 100)[0]
         return idx
 
+    @uses('CDLINVERTEDHAMMER', 'CDLHAMMER')
     def bull_inverse_hammer(self, *args):
 
-        ham = talib.CDLINVERTEDHAMMER(self.o, self.h, self.l, self.c)
-        ham1 = talib.CDLHAMMER(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLINVERTEDHAMMER')
+        ham1 = self.primitive('CDLHAMMER')
         idx = np.where(ham == 100)[0]
         idx1 = np.where(ham1 == 100)[0]
 
@@ -186,10 +304,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLGRAVESTONEDOJI', 'CDLDRAGONFLYDOJI')
     def bull_marubozu_gravestone_dragonfly(self, *args):
-        ham = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        gra = talib.CDLGRAVESTONEDOJI(self.o, self.h, self.l, self.c)
-        dra = talib.CDLDRAGONFLYDOJI(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLMARUBOZU')
+        gra = self.primitive('CDLGRAVESTONEDOJI')
+        dra = self.primitive('CDLDRAGONFLYDOJI')
 
         idx = np.where(ham == 100)[0]
         idx2 = np.where(gra == 100)[0]
@@ -211,9 +330,10 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLDOJI')
     def bear_marubozu_touch_doji(self, *args):
-        ham = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        doji = talib.CDLDOJI(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLMARUBOZU')
+        doji = self.primitive('CDLDOJI')
         idx = np.where(ham == 100)[0]
         idx1 = np.where(doji == 100)[0]
 
@@ -232,8 +352,9 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU')
     def bear_marubozu_up_cross_snr(self, *args):
-        ham = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLMARUBOZU')
         idx = np.where(ham == 100)[0]
 
         o = []
@@ -244,10 +365,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLENGULFING')
     def bear_rMarubozu_gMarubozu_red_bottom_wick(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        eng = talib.CDLENGULFING(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        eng = self.primitive('CDLENGULFING')
         idx = np.where(mar == -100)[0]
         idx3 = np.where(eng == -100)[0]
 
@@ -261,10 +383,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLDRAGONFLYDOJI')
     def bear_marubozu_dragonfly(self, *args):
 
-        ham = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        dragon = talib.CDLDRAGONFLYDOJI(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLMARUBOZU')
+        dragon = self.primitive('CDLDRAGONFLYDOJI')
         idx = np.where(ham == -100)[0]
         idx1 = np.where(dragon == 100)[0]
 
@@ -276,10 +399,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLDOJI')
     def bull_marubozu_leg_touch_doji(self, *args):
 
-        ham = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        doji = talib.CDLDOJI(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLMARUBOZU')
+        doji = self.primitive('CDLDOJI')
         idx = np.where(ham == -100)[0]
         idx1 = np.where(doji == 100)[0]
 
@@ -298,13 +422,15 @@ class Base:
         a[o] = 1
         return a
 
+    @uses()
     def bull_marubozu_leg_cross(self, *args):
         pass
 
+    @uses('CDLMARUBOZU', 'CDLENGULFING')
     def bull_gMarubozu_rMarubozu_green_top_wick(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        eng = talib.CDLENGULFING(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        eng = self.primitive('CDLENGULFING')
         idx = np.where(mar == 100)[0]
         idx3 = np.where(eng == 100)[0]
 
@@ -318,10 +444,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLGRAVESTONEDOJI')
     def bull_marubozu_gravestone(self, *args):
 
-        ham = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        grave = talib.CDLGRAVESTONEDOJI(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLMARUBOZU')
+        grave = self.primitive('CDLGRAVESTONEDOJI')
         idx = np.where(ham == 100)[0]
         idx1 = np.where(grave == 100)[0]
 
@@ -341,10 +468,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLINVERTEDHAMMER', 'CDLMARUBOZU', 'CDLHAMMER')
     def bear_invertedHammer_marubozu_rHammer(self, *args):
-        ham = talib.CDLINVERTEDHAMMER(self.o, self.h, self.l, self.c)
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        red = talib.CDLHAMMER(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLINVERTEDHAMMER')
+        mar = self.primitive('CDLMARUBOZU')
+        red = self.primitive('CDLHAMMER')
 
         idx = np.where(ham == 100)[0]
         idx1 = np.where(mar == 100)[0]
@@ -367,9 +495,10 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLSHOOTINGSTAR', 'CDLGRAVESTONEDOJI')
     def bear_shootingStar_gravestoneThrice(self, *args):
-        ham = talib.CDLSHOOTINGSTAR(self.o, self.h, self.l, self.c)
-        grave = talib.CDLGRAVESTONEDOJI(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLSHOOTINGSTAR')
+        grave = self.primitive('CDLGRAVESTONEDOJI')
 
         idx1 = np.where(ham == -100)[0]
         idx2 = np.where(grave == 100)[0]
@@ -393,9 +522,10 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLSHOOTINGSTAR', 'CDLGRAVESTONEDOJI')
     def bear_GinverseHammer_gravestone_RinverseHammer(self, *args):
-        ham = talib.CDLSHOOTINGSTAR(self.o, self.h, self.l, self.c)
-        grave = talib.CDLGRAVESTONEDOJI(self.o, self.h, self.l, self.c)
+        ham = self.primitive('CDLSHOOTINGSTAR')
+        grave = self.primitive('CDLGRAVESTONEDOJI')
 
         idx1 = np.where(ham == -100)[0]
         idx2 = np.where(grave == 100)[0]
@@ -419,11 +549,12 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLDRAGONFLYDOJI', 'CDLGRAVESTONEDOJI', 'CDLTAKURI')
     def bear_greenBody_gravestone_Dragonfly_Takuri(self, *args):
 
-        dra = talib.CDLDRAGONFLYDOJI(self.o, self.h, self.l, self.c)
-        grave = talib.CDLGRAVESTONEDOJI(self.o, self.h, self.l, self.c)
-        taku = talib.CDLTAKURI(self.o, self.h, self.l, self.c)
+        dra = self.primitive('CDLDRAGONFLYDOJI')
+        grave = self.primitive('CDLGRAVESTONEDOJI')
+        taku = self.primitive('CDLTAKURI')
 
         idx1 = np.where(grave == 100)[0]
         idx2 = np.where(dra == 100)[0]
@@ -445,22 +576,27 @@ class Base:
         a[o] = 1
         return a
 
+    @uses()
     def bull_redBody_downWick_rMarubozu_GinverseHammer(self, *args):
         pass
 
+    @uses()
     def bull_rHammer_dragonflyThrice(self, *args):
         pass
 
+    @uses()
     def bull_rHammer_dragonfly_gHammer(self, *args):
         pass
 
+    @uses()
     def bull_redBody_dragonfly_gravestone_GinverseHammer(self, *args):
         pass
 
+    @uses('CDLMARUBOZU', 'CDLHAMMER')
     def bear_Rmarubozu_Takuri_Rmarubozu(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        ham = talib.CDLHAMMER(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        ham = self.primitive('CDLHAMMER')
 
         idx = np.where(mar == -100)[0]
         idx1 = np.where(ham == 100)[0]
@@ -479,11 +615,12 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLHAMMER', 'CDLSHOOTINGSTAR')
     def bear_Gmarubozu_invertedHammer_Ghammer(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        ham = talib.CDLHAMMER(self.o, self.h, self.l, self.c)
-        inv = talib.CDLSHOOTINGSTAR(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        ham = self.primitive('CDLHAMMER')
+        inv = self.primitive('CDLSHOOTINGSTAR')
 
         idx = np.where(mar == 100)[0]
         idx1 = np.where(ham == 100)[0]
@@ -504,10 +641,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLGRAVESTONEDOJI')
     def bear_GmarubozuTwice_gravestone(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        grave = talib.CDLGRAVESTONEDOJI(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        grave = self.primitive('CDLGRAVESTONEDOJI')
 
         idx = np.where(mar == 100)[0]
         idx1 = np.where(grave == 100)[0]
@@ -521,11 +659,12 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLINVERTEDHAMMER', 'CDLDOJI')
     def bear_RinvertedHammer_Marubozu_doji(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        inv = talib.CDLINVERTEDHAMMER(self.o, self.h, self.l, self.c)
-        doji = talib.CDLDOJI(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        inv = self.primitive('CDLINVERTEDHAMMER')
+        doji = self.primitive('CDLDOJI')
 
         idx = np.where(mar == 100)[0]
         idx1 = np.where(inv == 100)[0]
@@ -545,10 +684,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLSHOOTINGSTAR')
     def bull_marubozu_shootingStar_Marubozu(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        star = talib.CDLSHOOTINGSTAR(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        star = self.primitive('CDLSHOOTINGSTAR')
 
         idx = np.where(mar == 100)[0]
         idx1 = np.where(star == -100)[0]
@@ -561,11 +701,12 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLHAMMER', 'CDLINVERTEDHAMMER')
     def bull_Rmarubozu_Rhammer_RinvertedHammer(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        ham = talib.CDLHAMMER(self.o, self.h, self.l, self.c)
-        inv = talib.CDLINVERTEDHAMMER(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        ham = self.primitive('CDLHAMMER')
+        inv = self.primitive('CDLINVERTEDHAMMER')
 
         idx = np.where(mar == -100)[0]
         idx1 = np.where(ham == 100)[0]
@@ -587,10 +728,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLDRAGONFLYDOJI')
     def bullRmarubozuTwice_Dragonfly(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        dra = talib.CDLDRAGONFLYDOJI(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        dra = self.primitive('CDLDRAGONFLYDOJI')
 
         idx = np.where(mar == -100)[0]
         idx1 = np.where(dra == 100)[0]
@@ -604,11 +746,12 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLTAKURI', 'CDLMARUBOZU', 'CDLDOJISTAR')
     def bull_Gtakuri_Rmarubozu_doji(self, *args):
 
-        hang = talib.CDLTAKURI(self.o, self.h, self.l, self.c)
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        star = talib.CDLDOJISTAR(self.o, self.h, self.l, self.c)
+        hang = self.primitive('CDLTAKURI')
+        mar = self.primitive('CDLMARUBOZU')
+        star = self.primitive('CDLDOJISTAR')
 
         idx = np.where(hang == 100)[0]
         idx1 = np.where(mar == -100)[0]
@@ -628,10 +771,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLMARUBOZU', 'CDLGRAVESTONEDOJI')
     def bear_RmarubozuTwice_gravestone(self, *args):
 
-        mar = talib.CDLMARUBOZU(self.o, self.h, self.l, self.c)
-        grave = talib.CDLGRAVESTONEDOJI(self.o, self.h, self.l, self.c)
+        mar = self.primitive('CDLMARUBOZU')
+        grave = self.primitive('CDLGRAVESTONEDOJI')
 
         idx = np.where(mar == -100)[0]
         idx2 = np.where(grave == 100)[0]
@@ -646,9 +790,10 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLSHOOTINGSTAR')
     def bear_GbodyUpWick_GinvertedHammer_GinvertedHammer(self, *args):
 
-        shoot = talib.CDLSHOOTINGSTAR(self.o, self.h, self.l, self.c)
+        shoot = self.primitive('CDLSHOOTINGSTAR')
 
         idx = np.where(shoot == -100)[0]
         o = []
@@ -674,9 +819,10 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLSHOOTINGSTAR')
     def bear_twoGreens_shootingStar(self, *args):
 
-        shoot = talib.CDLSHOOTINGSTAR(self.o, self.h, self.l, self.c)
+        shoot = self.primitive('CDLSHOOTINGSTAR')
 
         idx = np.where(shoot == -100)[0]
 
@@ -698,10 +844,11 @@ class Base:
         a[o] = 1
         return a
 
+    @uses('CDLHAMMER', 'CDLLONGLEGGEDDOJI')
     def bear_Takuri_redBody_longLegged_redBody(self, *args):
 
-        tak = talib.CDLHAMMER(self.o, self.h, self.l, self.c)
-        long = talib.CDLLONGLEGGEDDOJI(self.o, self.h, self.l, self.c)
+        tak = self.primitive('CDLHAMMER')
+        long = self.primitive('CDLLONGLEGGEDDOJI')
 
         idx = np.where(tak == 100)[0]
         idx2 = np.where(long == 100)[0]
@@ -724,12 +871,14 @@ class Base:
         a[o] = 1
         return a
 
+    @uses()
     def bull_MarubozuTwice_Dragonfly(self, *args):
         pass
 
+    @uses('CDLHAMMER')
     def bull_RhammerThrice(self, *args):
 
-        hammer = talib.CDLHAMMER(self.o, self.h, self.l, self.c)
+        hammer = self.primitive('CDLHAMMER')
 
         idx = np.where(hammer == 100)[0]
 
@@ -755,8 +904,10 @@ class Base:
         a[o] = 1
         return a
 
+    @uses()
     def bull_RinvertedHammer_Rhammer_Gtakuri(self, *args):
         pass
 
+    @uses()
     def bull_RinvertedHammer_SpinningTop_LongDoji_GHammer(self, *args):
         pass
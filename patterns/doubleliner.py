@@ -1,6 +1,7 @@
-from patterns.base import BasePattern
+from patterns.base import BasePattern, direction
 import numpy as np
-# import numpy as np
+
+BEARISH, BULLISH, INDECISIVE = -1, 1, 0
 
 
 class TwoLinePattern(BasePattern):
@@ -12,208 +13,131 @@ class TwoLinePattern(BasePattern):
 
     Methods:
 
-        iterate() : >>> This method loops through array of candle bars
-        and tries to determine if
-        it falls as a pattern or not
-
-        confirm_bull_pattern(): >>> This method receives open,high,low,
-        close values and tries to output
-        if the pattern indicates upward movement
+        iterate() : >>> This method evaluates every pair of consecutive
+        candle bars at once (previous bars df[:-1], current bars df[1:])
+        and tries to determine if each falls as a pattern or not
 
-        confirm_bear_pattern(): >>> This method receives open,high,low,close
-        values and tries to output
-        if the pattern indicates downward movement
+        bull_signals()/bear_signals(): >>> The conditions of the pattern
+        over the (open,high,low,close) column arrays of the previous and
+        current bars, returning boolean masks of upward/downward movement
 
     """
 
-    def confirm_bull_pattern(self, *args):
-        pass
-
-    def confirm_bear_pattern(self):
-        pass
-
-    def iterate(self):
-        self.truth = []
-        ad = self.df
-        for x, y in enumerate(ad):
-            if x - 1 == -1:
-                self.truth.append(0)
-                continue
-
-            last = ad[x - 1]
-            current = y
+    span = 2
 
-            l_op, l_high, l_low, l_close = last
-            c_op, c_high, c_low, c_close = current
+    # directions of the (previous, current) bar each side applies to
+    bull_when = (BEARISH, BULLISH)
+    bear_when = (BULLISH, BEARISH)
 
-            lt = self.f(l_op, l_close)
-            ct = self.f(c_op, c_close)
+    def bull_signals(self, last, current):
+        return np.zeros(len(last[0]), dtype=bool)
 
-            if lt == "Bearish" and ct == "Bullish":
-                integer = self.confirm_bull_pattern(
-                    (l_op, l_high, l_low, l_close),
-                    (c_op, c_high, c_low, c_close),
-                )
+    def bear_signals(self, last, current):
+        return np.zeros(len(last[0]), dtype=bool)
 
-                self.truth.append(integer)
-            elif lt == "Bullish" and ct == "Bearish":
-                integer = self.confirm_bear_pattern(
-                    (l_op, l_high, l_low, l_close),
-                    (c_op, c_high, c_low, c_close),
-                )
+    def iterate(self):
+        ad = np.asarray(self.df, dtype=np.float64).reshape(-1, 4)
+        op, close = ad[:, 0], ad[:, 3]
 
-                self.truth.append(integer)
+        # direction of every bar once, nan bars match no direction
+        trend = direction(op, close)
+        trend[(op != op) | (close != close)] = 2
+        last, current = tuple(ad[:-1].T), tuple(ad[1:].T)
 
-            else:
-                self.truth.append(0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bull = (
+                (trend[:-1] == self.bull_when[0]) &
+                (trend[1:] == self.bull_when[1]) &
+                self.bull_signals(last, current))
+            bear = (
+                (trend[:-1] == self.bear_when[0]) &
+                (trend[1:] == self.bear_when[1]) &
+                self.bear_signals(last, current))
 
-        return np.array(self.truth)
+        self.truth = np.zeros(len(ad), dtype=np.int8)
+        self.truth[1:] = bull.astype(np.int8) - bear.astype(np.int8)
+        return self.truth
 
 
 class Harami(TwoLinePattern):
-    def confirm_bull_pattern(self, *args):
-        lt_open, _, _, lt_close = args[0]
-        rt_open, rt_high, rt_low, rt_close = args[1]
-
-        if not((lt_open - lt_close) / (rt_close - rt_open) > 2):
-            return 0
+    def bull_signals(self, last, current):
+        lt_open, _, _, lt_close = last
+        rt_open, rt_high, rt_low, rt_close = current
 
-        if (
-            (lt_open > rt_high and lt_open > rt_close) and
-            (lt_close < rt_low and lt_close < rt_open)
-        ):
-            return 1
+        return (
+            ((lt_open - lt_close) / (rt_close - rt_open) > 2) &
+            (lt_open > rt_high) & (lt_open > rt_close) &
+            (lt_close < rt_low) & (lt_close < rt_open))
 
-        return 0
+    def bear_signals(self, last, current):
+        lt_open, _, _, lt_close = last
+        rt_open, rt_high, rt_low, rt_close = current
 
-    def confirm_bear_pattern(self, *args):
-        lt_open, _, _, lt_close = args[0]
-        rt_open, rt_high, rt_low, rt_close = args[1]
-
-        if not((lt_close - lt_open) / (rt_open - rt_close) > 2):
-            return 0
-
-        if (
-            (lt_close > rt_open and lt_close > rt_high) and
-            (lt_open < rt_close and lt_open < rt_low)
-        ):
-            return -1
-
-        return 0
+        return (
+            ((lt_close - lt_open) / (rt_open - rt_close) > 2) &
+            (lt_close > rt_open) & (lt_close > rt_high) &
+            (lt_open < rt_close) & (lt_open < rt_low))
 
 
 class HaramiCross(TwoLinePattern):
-    def confirm_bull_pattern(self, *args):
-        lt_open, _, _, lt_close = args[0]
-        _, rt_high, rt_low, _ = args[1]
-
-        if (lt_open > rt_high) and (lt_close < rt_low):
-            return 1
 
-        return 0
+    # the current bar is a doji (open == close) on both sides
+    bull_when = (BEARISH, INDECISIVE)
+    bear_when = (BULLISH, INDECISIVE)
 
-    def confirm_bear_pattern(self, *args):
-        lt_open, _, _, lt_close = args[0]
-        _, rt_high, rt_low, _ = args[1]
-
-        if (lt_close > rt_high) and (lt_open < rt_low):
-            return -1
-
-        return 0
-
-    def iterate(self):
-        self.truth = []
-        ad = self.df
-        for x, y in enumerate(ad):
+    def bull_signals(self, last, current):
+        lt_open, _, _, lt_close = last
+        _, rt_high, rt_low, _ = current
+        return (lt_open > rt_high) & (lt_close < rt_low)
 
-            if x - 1 == -1:
-                self.truth.append(0)
-                continue
-
-            last = ad[x - 1]
-            current = y
-
-            l_op, l_high, l_low, l_close = last
-            c_op, c_high, c_low, c_close = current
-
-            lt = self.f(l_op, l_close)
-            ct = self.f(c_op, c_close)
-
-            # This block below was the only thing I changed
-            if lt == "Bearish" and ct == "Indecisive":
-                integer = self.confirm_bull_pattern(
-                    (l_op, l_high, l_low, l_close),
-                    (c_op, c_high, c_low, c_close),
-                )
-
-                self.truth.append(integer)
-            elif lt == "Bullish" and ct == "Indecisive":
-                integer = self.confirm_bear_pattern(
-                    (l_op, l_high, l_low, l_close),
-                    (c_op, c_high, c_low, c_close),
-                )
-                self.truth.append(integer)
-            else:
-                self.truth.append(0)
-
-        return np.array(self.truth)
+    def bear_signals(self, last, current):
+        lt_open, _, _, lt_close = last
+        _, rt_high, rt_low, _ = current
+        return (lt_close > rt_high) & (lt_open < rt_low)
 
 
 class Engulfing(TwoLinePattern):
-    def confirm_bull_pattern(self, *args):
-        lt_open, _, _, lt_close = args[0]
-        rt_open, _, _, rt_close = args[1]
-
-        if(
-            rt_close < lt_open and
-            rt_open <= lt_close and
-            1 < (abs(rt_open - rt_close) / abs(lt_open - lt_close)) <= 2.5
-        ):
-            return 1
-
-        return 0
-
-    def confirm_bear_pattern(self, *args):
-        lt_open, _, _, lt_close = args[0]
-        rt_open, _, _, rt_close = args[1]
-
-        if(
-            rt_close > lt_open and
-            rt_open >= lt_close and
-            1 < (abs(rt_open - rt_close) / abs(lt_open - lt_close)) <= 2.5
-        ):
-            return -1
-
-        return 0
+    @staticmethod
+    def _ratio(last, current):
+        lt_open, _, _, lt_close = last
+        rt_open, _, _, rt_close = current
+        ratio = np.abs(rt_open - rt_close) / np.abs(lt_open - lt_close)
+        return (1 < ratio) & (ratio <= 2.5)
+
+    def bull_signals(self, last, current):
+        lt_open, _, _, lt_close = last
+        rt_open, _, _, rt_close = current
+        return (
+            (rt_close < lt_open) & (rt_open <= lt_close) &
+            self._ratio(last, current))
+
+    def bear_signals(self, last, current):
+        lt_open, _, _, lt_close = last
+        rt_open, _, _, rt_close = current
+        return (
+            (rt_close > lt_open) & (rt_open >= lt_close) &
+            self._ratio(last, current))
 
 
 class PiercingDarkCloud(TwoLinePattern):
-    def confirm_bull_pattern(self, *args):
-        lt_open, _, _, lt_close = args[0]
-        rt_open, rt_high, rt_low, rt_close = args[1]
 
-        lt_middle = 0.5 * (lt_open + lt_close)
+    # the former (rt_close and rt_high) is rt_high unless rt_close is 0.0,
+    # np.where(rt_close != 0, ...) keeps that reading over arrays
 
-        if (
-            rt_open < lt_close and
-            rt_close > lt_middle and
-            (rt_close and rt_high) < lt_open
-        ):
-            return 1
-
-        return 0
+    def bull_signals(self, last, current):
+        lt_open, _, _, lt_close = last
+        rt_open, rt_high, _, rt_close = current
+        lt_middle = 0.5 * (lt_open + lt_close)
 
-    def confirm_bear_pattern(self, *args):
-        lt_open, _, _, lt_close = args[0]
-        rt_open, rt_high, rt_low, rt_close = args[1]
+        return (
+            (rt_open < lt_close) & (rt_close > lt_middle) &
+            (np.where(rt_close != 0, rt_high, rt_close) < lt_open))
 
+    def bear_signals(self, last, current):
+        lt_open, _, _, lt_close = last
+        rt_open, _, rt_low, rt_close = current
         lt_middle = 0.5 * (lt_open + lt_close)
 
-        if (
-            rt_open > lt_close and
-            rt_close < lt_middle and
-            (rt_close and rt_low) > lt_open
-        ):
-            return -1
-
-        return 0
+        return (
+            (rt_open > lt_close) & (rt_close < lt_middle) &
+            (np.where(rt_close != 0, rt_low, rt_close) > lt_open))
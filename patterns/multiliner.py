@@ -2,7 +2,7 @@ import pandas as pd
 import numpy as np
 
 
-from patterns.base import BasePattern
+from patterns.base import BasePattern, direction
 
 
 df = pd.DataFrame(
@@ -16,198 +16,133 @@ df = pd.DataFrame(
 )
 
 
-class MorningStar(BasePattern):
-    def confirm_pattern(self, *args):
-        pt_open, pt_high, pt_low, pt_close = args[0]
-        mt_open, mt_high, mt_low, mt_close = args[1]
-        rt_open, rt_high, rt_low, rt_close = args[2]
-        mt_cond = args[3]
+def windows(ohlc, length):
+    """ Read only (n - length + 1, length, 4) view of every run of
+    "length" consecutive bars of an (n, 4) array, no copy is made
+    (as_strided, since sliding_window_view needs numpy >= 1.20) """
 
-        pt_candle_size = pt_open - pt_close
-        rt_candle_size = rt_close - rt_open
-        pt_middle = (pt_close + pt_open) / 2
-        rt_middle = (rt_close + rt_open) / 2
+    ohlc = np.ascontiguousarray(ohlc, dtype=np.float64).reshape(-1, 4)
+    count = max(len(ohlc) - length + 1, 0)
+    row, column = ohlc.strides
+    return np.lib.stride_tricks.as_strided(
+        ohlc, shape=(count, length, 4), strides=(row, row, column),
+        writeable=False)
 
-        # Check that size of middle candlestick is greater
-        # than left or right candlestick and return 0
-
-        if (
-            abs(mt_close - mt_open) > (
-                pt_candle_size or rt_candle_size
-            )
-        ):
-            return 0
-
-        # Verify that there are long wicks and return 0
-
-        if (
-            (pt_high - pt_open) + (pt_close - pt_low) >
-            (pt_open - pt_middle) or
-            (rt_high - rt_close) + (rt_open - rt_low) >
-            (rt_close - rt_middle)
-        ):
-            return 0
-
-        if (
-            rt_close >= pt_middle and
-            pt_open >= rt_middle and
-            rt_open == pt_close
-        ):
-            if (
-                mt_cond == "Bullish" or
-                mt_cond == "Indecisive"
-            ):
-                if (
-                    mt_close < (
-                        pt_middle and rt_middle
-                    ) and
-                    (mt_high and mt_close) < (pt_middle or rt_middle) and
-                    (mt_high - mt_close <= mt_open - mt_low)
-                ):
-                    return 1
-            elif mt_cond == "Bearish":
-                return 0
-                # if (
-                #     mt_open < (
-                #         pt_middle and rt_middle
-                #     ) and
-                #     (mt_high and mt_open) >= (pt_middle or rt_middle) and
-                #     mt_high - mt_open <= mt_close - mt_low
-                # ):
-                #     return 1
-        return 0
 
-    def iterate(self):
-        self.truth = []
-        ad = self.df
-        for x, y in enumerate(ad):
+def _and(left, right):
+    # python's "left and right" over arrays, nan is truthy
+    return np.where(left != 0, right, left)
+
 
-            if x - 1 == -1 or x - 2 == -1:
-                self.truth.append(0)
-                continue
+def _or(left, right):
+    # python's "left or right" over arrays, nan is truthy
+    return np.where(left != 0, left, right)
 
-            previous = ad[x - 2]
-            last = ad[x - 1]
-            current = y
 
-            p_op, p_high, p_low, p_close = previous
-            l_op, l_high, l_low, l_close = last
+class MultiLinePattern(BasePattern):
 
-            c_op, c_high, c_low, c_close = current
+    f"""
+    Base class of the patterns spanning "length" bars, iterate() slides
+    a window of that many bars over the array and evaluates signals()
+    over every window at once. The first length - 1 bars are always 0.
 
-            pt = self.f(p_op, p_close)
-            lt = self.f(l_op, l_close)
-            ct = self.f(c_op, c_close)
+    Subclasses implement signals(bars, trends) where bars[k] is the
+    (open,high,low,close) column arrays of the k-th bar of every window
+    and trends[k] their int8 directions (-1, 1, 0 and 2 for nan bars),
+    it returns the int8 signal of every window.
 
-            # This block below was the only thing I changed
-            if pt == "Bearish" and ct == "Bullish":
-                integer = self.confirm_pattern(
-                    (p_op, p_high, p_low, p_close),
-                    (l_op, l_high, l_low, l_close),
-                    (c_op, c_high, c_low, c_close),
-                    lt,
-                )
+    """
+
+    length = 3
+
+    def __init__(self, array_x, length=None):
+        super().__init__(array_x)
+        if length is not None:
+            self.length = length
+
+    def signals(self, bars, trends):
+        return np.zeros(len(trends[0]), dtype=np.int8)
+
+    def iterate(self):
+        view = windows(self.df, self.length)
+        bars = [tuple(view[:, k, j] for j in range(4))
+                for k in range(self.length)]
 
-                self.truth.append(integer)
-            else:
-                self.truth.append(0)
+        trends = []
+        for op, _, _, close in bars:
+            trend = direction(op, close)
+            trend[(op != op) | (close != close)] = 2
+            trends.append(trend)
 
-        return np.array(self.truth)
+        self.truth = np.zeros(len(self.df), dtype=np.int8)
+        if len(view):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.truth[self.length - 1:] = self.signals(bars, trends)
+        return self.truth
 
 
-class EveningStar(BasePattern):
-    def confirm_pattern(self, *args):
-        pt_open, pt_high, pt_low, pt_close = args[0]
-        mt_open, mt_high, mt_low, mt_close = args[1]
-        rt_open, rt_high, rt_low, rt_close = args[2]
-        mt_cond = args[3]
+class MorningStar(MultiLinePattern):
+
+    # The conditions of the former loop over every window at once,
+    # "x and y" / "x or y" of prices keep python's truthiness (_and/_or)
+
+    def signals(self, bars, trends):
+        (pt_open, pt_high, pt_low, pt_close), \
+            (mt_open, mt_high, mt_low, mt_close), \
+            (rt_open, rt_high, rt_low, rt_close) = bars
+
+        pt_candle_size = pt_open - pt_close
+        rt_candle_size = rt_close - rt_open
+        pt_middle = (pt_close + pt_open) / 2
+        rt_middle = (rt_close + rt_open) / 2
+
+        found = (
+            (trends[0] == -1) & (trends[2] == 1) &
+            ((trends[1] == 1) | (trends[1] == 0)) &
+            ~(np.abs(mt_close - mt_open) > _or(
+                pt_candle_size, rt_candle_size)) &
+            ~(
+                ((pt_high - pt_open) + (pt_close - pt_low) >
+                    (pt_open - pt_middle)) |
+                ((rt_high - rt_close) + (rt_open - rt_low) >
+                    (rt_close - rt_middle))) &
+            (rt_close >= pt_middle) & (pt_open >= rt_middle) &
+            (rt_open == pt_close) &
+            (mt_close < _and(pt_middle, rt_middle)) &
+            (_and(mt_high, mt_close) < _or(pt_middle, rt_middle)) &
+            (mt_high - mt_close <= mt_open - mt_low)
+        )
+        return found.astype(np.int8)
+
+
+class EveningStar(MultiLinePattern):
+
+    # Like the loop version, an evening star is signalled with 1 too
+
+    def signals(self, bars, trends):
+        (pt_open, pt_high, pt_low, pt_close), \
+            (mt_open, mt_high, mt_low, mt_close), \
+            (rt_open, rt_high, rt_low, rt_close) = bars
 
         pt_candle_size = pt_close - pt_open
         rt_candle_size = rt_open - rt_close
         pt_middle = (pt_close + pt_open) / 2
         rt_middle = (rt_close + rt_open) / 2
 
-        # Check that size of middle candlestick is greater
-        # than left or right candlestick and return 0
-
-        if (
-            abs(mt_close - mt_open) > (
-                pt_candle_size or rt_candle_size
-            )
-        ):
-            return 0
-
-        # Verify that there are  long wicks and return 0
-
-        if (
-            (pt_high - pt_close) + (pt_open - pt_low) >
-            (pt_close - pt_middle) or
-            (rt_high - rt_open) + (rt_close - rt_low) >
-            (rt_open - rt_middle)
-        ):
-            return 0
-
-        if (
-            rt_close <= pt_middle and
-            pt_close >= rt_middle and
-            rt_open == pt_close
-        ):
-            if (
-                mt_cond == "Bearish" or
-                mt_cond == "Indecisive"
-            ):
-                if (
-                    mt_close > (
-                        pt_middle and rt_middle
-                    ) and
-                    (mt_close and mt_low) > (pt_middle or rt_middle) and
-                    (mt_close - mt_low <= mt_high - mt_open)
-                ):
-                    return 1
-            elif mt_cond == "Bullish":
-                return 0
-                # if (
-                #     mt_open > (
-                #         pt_middle and rt_middle
-                #     ) and
-                #     mt_open - mt_low >= (pt_middle or rt_middle) and
-                #     mt_open - mt_low <= mt_high - mt_close
-                # ):
-                #     return 1
-        return 0
-
-    def iterate(self):
-        self.truth = []
-        ad = self.df
-        for x, y in enumerate(ad):
-
-            if x - 1 == -1 or x - 2 == -1:
-                self.truth.append(0)
-                continue
-
-            prev = ad[x - 2]
-            last = ad[x - 1]
-            current = y
-
-            p_op, p_high, p_low, p_close = prev
-            l_op, l_high, l_low, l_close = last
-            c_op, c_high, c_low, c_close = current
-
-            pt = self.f(p_op, p_close)
-            lt = self.f(l_op, l_close)
-            ct = self.f(c_op, c_close)
-
-            # This block below was the only thing I changed
-            if pt == "Bullish" and ct == "Bearish":
-                integer = self.confirm_pattern(
-                    (p_op, p_high, p_low, p_close),
-                    (l_op, l_high, l_low, l_close),
-                    (c_op, c_high, c_low, c_close),
-                    lt,
-                )
-
-                self.truth.append(integer)
-            else:
-                self.truth.append(0)
-
-        return np.array(self.truth)
+        found = (
+            (trends[0] == 1) & (trends[2] == -1) &
+            ((trends[1] == -1) | (trends[1] == 0)) &
+            ~(np.abs(mt_close - mt_open) > _or(
+                pt_candle_size, rt_candle_size)) &
+            ~(
+                ((pt_high - pt_close) + (pt_open - pt_low) >
+                    (pt_close - pt_middle)) |
+                ((rt_high - rt_open) + (rt_close - rt_low) >
+                    (rt_open - rt_middle))) &
+            (rt_close <= pt_middle) & (pt_close >= rt_middle) &
+            (rt_open == pt_close) &
+            (mt_close > _and(pt_middle, rt_middle)) &
+            (_and(mt_close, mt_low) > _or(pt_middle, rt_middle)) &
+            (mt_close - mt_low <= mt_high - mt_open)
+        )
+        return found.astype(np.int8)
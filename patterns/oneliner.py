@@ -3,7 +3,113 @@ from patterns.base import BasePattern
 import numpy as np
 
 
-class Doji(BasePattern):
+# NumPy kernels of the one line patterns, each one evaluates its pattern
+# over a whole (n, 4) open,high,low,close array at once and returns an
+# int8 array of signals (1 bullish, -1 bearish, 0 no pattern).
+#
+# The kernels are the only definition of each pattern, they keep the
+# conditions of the former row by row loops exactly, operator precedence
+# included (high - op / op - low is high - 1 - low), rows whose direction
+# can not be told (nan prices) give 0.
+
+
+def _columns(ohlc):
+    ohlc = np.asarray(ohlc, dtype=np.float64).reshape(-1, 4)
+    return ohlc[:, 0], ohlc[:, 1], ohlc[:, 2], ohlc[:, 3]
+
+
+def _signal(bearish, bullish):
+    return bullish.astype(np.int8) - bearish.astype(np.int8)
+
+
+def doji(ohlc):
+    op, _, _, close = _columns(ohlc)
+    return (op == close).astype(np.int8)
+
+
+def gravestone_doji(ohlc):
+    op, high, low, close = _columns(ohlc)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        found = (op == close) & (high - op / op - low > 2.5)
+    return -found.astype(np.int8)
+
+
+def dragonfly_doji(ohlc):
+    op, high, low, close = _columns(ohlc)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        found = (op == close) & (op - low / high - op > 2.5)
+    return found.astype(np.int8)
+
+
+def hammer(ohlc):
+    op, high, low, close = _columns(ohlc)
+    real = np.abs(op - close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bear = np.round((close - low) / real)
+        bull = np.round((op - low) / real)
+    return _signal(
+        (op > close) & (high - op == 0) & (2.5 >= bear) & (bear >= 2),
+        (op < close) & (high - close == 0) & (2.5 >= bull) & (bull >= 2))
+
+
+def inverted_hammer(ohlc):
+    op, high, low, close = _columns(ohlc)
+    real = np.abs(op - close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bear = np.round((high - op) / real)
+        bull = np.round((high - close) / real)
+    return _signal(
+        (op > close) & (close - low == 0) & (2.5 >= bear) & (bear >= 2),
+        (op < close) & (op - low == 0) & (2.5 >= bull) & (bull >= 2))
+
+
+def _pinbar_legs(ohlc):
+    # (up, leg) of the bearish and of the bullish reading of every bar
+    op, high, low, close = _columns(ohlc)
+    return (
+        op, close, np.abs(op - close),
+        (high - op, close - low), (high - close, op - low))
+
+
+def pinbar(ohlc):
+    op, close, real, bear, bull = _pinbar_legs(ohlc)
+
+    def confirm(up, leg):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = real / up
+            return (ratio <= 3) & (ratio >= 1.8) & (leg / real >= 2)
+
+    return _signal((op > close) & confirm(*bear), (op < close) & confirm(*bull))
+
+
+def inverted_pinbar(ohlc):
+    op, close, real, bear, bull = _pinbar_legs(ohlc)
+
+    def confirm(up, leg):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = real / leg
+            return (
+                (np.round(ratio) <= 3) & (ratio >= 1.8) &
+                (np.round(up / real) >= 2))
+
+    return _signal((op > close) & confirm(*bear), (op < close) & confirm(*bull))
+
+
+class OneLinePattern(BasePattern):
+
+    """
+    Base of the one line patterns, iterate() runs the class kernel over
+    every bar at once and returns its int8 signals
+    """
+
+    kernel = None
+
+    def iterate(self):
+        self.truth = self.kernel(self.df)
+        return self.truth
+
+
+class Doji(OneLinePattern):
 
     """
     This class determines if the candle bars are dojis,
@@ -11,180 +117,54 @@ class Doji(BasePattern):
 
     Methods:
 
-        iterate() : >>> This method loops through array of
-        candle bars and tries to determine if
-        it falls as a pattern or not
+        iterate() : >>> This method evaluates the whole array of
+        candle bars at once and tries to determine if
+        each falls as a pattern or not
     """
 
-    def iterate(self):
-        self.truth = []
-        ad = self.df
-        for x in ad:
-            op, _, _, close = x[0], x[1], x[2], x[3]
-            if op == close:
-                self.truth.append(1)
-            else:
-                self.truth.append(0)
-        return np.array(self.truth)
+    kernel = staticmethod(doji)
 
 
-class GravestoneDoji(BasePattern):
+class GravestoneDoji(OneLinePattern):
 
     f"""
-    This class determines if the candle bars are dojis,
-    appends 1 or 0 depending on if condition is true or not
+    This class determines if the candle bars are gravestone dojis,
+    appends -1 or 0 depending on if condition is true or not
 
     Methods:
 
-        iterate() : >>> This method loops through array of
-                        candle bars and tries to determine if
-                        it falls as a pattern or not
-
-        confirm_pattern(): >>> This method receives
-        open,high,low,close values and tries to output if
-        it falls as Pattern or not...
+        iterate() : >>> This method evaluates the whole array of
+                        candle bars at once and tries to determine if
+                        each falls as a pattern or not
 
     """
 
-    def confirm_pattern(self, op, high, low, close):
-        if high - op / op - low > 2.5:
-            return -1
-        return 0
+    kernel = staticmethod(gravestone_doji)
 
-    def iterate(self):
-        truth = []
-        ad = self.df
-        for x in ad:
-            op, high, low, close = x[0], x[1], x[2], x[3]
-            if op == close:
-                integer = self.confirm_pattern(op, high, low, close)
-                truth.append(integer)
-            else:
-                truth.append(0)
 
-        return np.array(truth)
+class DragonFlyDoji(GravestoneDoji):
 
+    kernel = staticmethod(dragonfly_doji)
 
-class DragonFlyDoji(GravestoneDoji):
-    def confirm_pattern(self, op, high, low, close):
-        if op - low / high - op > 2.5:
-            return 1
-        return 0
 
+class Hammer(OneLinePattern):
 
-class Hammer(BasePattern):
-    def confirm_pattern(self, leg, body, direction):
-        if 2.5 >= round(leg / body) >= 2:
-            return direction[-1]
-        return 0
+    kernel = staticmethod(hammer)
 
-    def iterate(self):
-        self.truth = []
-        ad = self.df
-        for x in ad:
-            op, high, low, close = x[0], x[1], x[2], x[3]
-            real = abs(op - close)
-            candle = self.f(op, close)
-
-            if candle == "Bearish":
-                if high - op != 0:
-                    self.truth.append(0)
-                    continue
-                integer = self.confirm_pattern(
-                    close - low, real, ("Bearish", -1))
-                self.truth.append(integer)
-
-            elif candle == "Bullish":
-                if high - close != 0:
-                    self.truth.append(0)
-                    continue
-                integer = self.confirm_pattern(
-                    op - low, real, ("Bullish", 1))
-                self.truth.append(integer)
-
-            elif candle == "Indecisive":
-                self.truth.append(0)
-
-        return np.array(self.truth)
-
-
-class InvertedHammer(BasePattern):
-    def confirm_pattern(self, up, body, direction):
-        if 2.5 >= round(up / body) >= 2:
-            return direction[-1]
-        return 0
 
-    def iterate(self):
-        self.truth = []
-        ad = self.df
-        for x in ad:
-            op, high, low, close = x[0], x[1], x[2], x[3]
-            real = abs(op - close)
-            func = self.f(op, close)
-            direction = func
-
-            if direction == "Bearish":
-                if close - low != 0:
-                    self.truth.append(0)
-                    continue
-                integer = self.confirm_pattern(
-                    high - op, real, ("Bearish", -1))
-                self.truth.append(integer)
-
-            elif direction == "Bullish":
-                if op - low != 0:
-                    self.truth.append(0)
-                    continue
-                integer = self.confirm_pattern(
-                    high - close, real, ("Bullish", 1))
-                self.truth.append(integer)
-
-            elif direction == "Indecisive":
-                self.truth.append(0)
-
-        return np.array(self.truth)
-
-
-class Pinbar(BasePattern):
-    def confirm_pattern(self, up, leg, body, direction):
-        if body / up <= 3 and body / up >= 1.8 and leg / body >= 2:
-            return direction[-1]
-        return 0
+class InvertedHammer(OneLinePattern):
+
+    kernel = staticmethod(inverted_hammer)
 
-    def iterate(self):
-        self.truth = []
-        ad = self.df
-        for x in ad:
-            op, high, low, close = x
-
-            real = abs(op - close)
-            candle = self.f(op, close)
-            if candle == "Bearish":
-                integer = self.confirm_pattern(
-                    high - op, close - low, real, ("Bearish", -1)
-                )
-                self.truth.append(integer)
-
-            elif candle == "Bullish":
-                integer = self.confirm_pattern(
-                    high - close, op - low, real, ("Bullish", 1)
-                )
-                self.truth.append(integer)
-
-            elif candle == "Indecisive":
-                self.truth.append(0)
-        return np.array(self.truth)
+
+class Pinbar(OneLinePattern):
+
+    kernel = staticmethod(pinbar)
 
 
 class InvertedPinbar(Pinbar):
-    def confirm_pattern(self, up, leg, body, direction):
-        if (
-            round(body / leg) <= 3 and
-            body / leg >= 1.8 and
-            round(up / body) >= 2
-        ):
-            return direction[-1]
-        return 0
+
+    kernel = staticmethod(inverted_pinbar)
 
 
 class SpinningTop(BasePattern):
@@ -0,0 +1,91 @@
+from collections import deque
+
+import numpy as np
+
+
+def span_of(pattern):
+    # bars the pattern class looks at, "length" of the multi line ones
+    return getattr(pattern, 'length', None) or pattern.span
+
+
+class PatternStream:
+
+    """
+    Incremental detection of candlestick patterns for live strategies.
+
+    The signal a pattern gives a bar only depends on that bar and the
+    span - 1 bars before it (1 for one line patterns, 2 for two line
+    patterns, "length" for multi line ones), so the stream keeps the last
+    k bars the patterns need, k being their largest span, and on every
+    new bar evaluates each pattern over its newest window only. A bar
+    check is O(patterns x k) whatever the length of the history, and
+    replaying a history bar by bar gives the same signals as the batch
+    iterate() of each pattern over it (0 until a pattern has seen its
+    span of bars).
+
+    [INIT VALUES]
+
+    1. patterns :== {name: pattern class} or a list of pattern
+    classes, named after the class then
+
+    Methods:
+
+        update(open, high, low, close) : >>> Adds a closed bar, returns
+        {name: signal} of that bar
+
+        extend(ohlc) : >>> Adds many bars ((n, 4) array or DataFrame),
+        returns {name: int8 array} of their signals
+
+    """
+
+    columns = ['open', 'high', 'low', 'close']
+
+    def __init__(self, patterns):
+        if not isinstance(patterns, dict):
+            patterns = {x.__name__: x for x in patterns}
+
+        for name, pattern in patterns.items():
+            if not callable(getattr(pattern, 'iterate', None)):
+                raise TypeError(f"{name} can not be evaluated, no iterate()")
+
+        self.patterns = dict(patterns)
+        self.spans = {x: span_of(y) for x, y in self.patterns.items()}
+        self.k = max(self.spans.values(), default=1)
+        self._bars = deque(maxlen=self.k)
+
+    def __len__(self):
+        return len(self._bars)
+
+    def __repr__(self):
+        return f'<PatternStream {list(self.patterns)} k={self.k}>'
+
+    def _signals(self):
+        bars = np.array(self._bars, dtype=np.float64)
+        out = {}
+        for name, pattern in self.patterns.items():
+            span = self.spans[name]
+            if len(bars) < span:
+                out[name] = 0
+            else:
+                out[name] = int(pattern(bars[-span:]).iterate()[-1])
+        return out
+
+    def update(self, open_x, high, low, close):
+        self._bars.append((open_x, high, low, close))
+        return self._signals()
+
+    def extend(self, ohlc):
+        try:
+            ohlc = ohlc[self.columns].values
+        except (AttributeError, IndexError):
+            pass
+        ohlc = np.asarray(ohlc, dtype=np.float64).reshape(-1, 4)
+
+        out = {x: np.zeros(len(ohlc), dtype=np.int8) for x in self.patterns}
+        for i, bar in enumerate(ohlc.tolist()):
+            for name, signal in self.update(*bar).items():
+                out[name][i] = signal
+        return out
+
+    def reset(self):
+        self._bars.clear()
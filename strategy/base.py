@@ -1,7 +1,9 @@
 import influxdb as db
 import talib
 import zmq
-from tradex.strategy.indicators import Indicator
+from tradex.strategy.registry import registry
+from tradex.market.store import BarStore
+from tradex.market.poller import EventLoop
 # import time
 
 
@@ -18,29 +20,47 @@ class Strategy1:
 
         self.max_period = 100
 
+        # make sure the market keeps enough bars for our longest indicator
+        if other:
+            other.require_lookback(self.max_period)
+
         # self.monitor = self.timeframes[1]
         self.monitor = 'EURUSD'
 
         self.client = db.DataFrameClient(
             database=self.market)
 
-        self.init = self.client.query(
-            f"SELECT open,high,low,close from {self.market} \
-            LIMIT {self.max_period}"
-        ).get(self.monitor).dropna()
+        self.store = BarStore(self.market)
+
+        self.init = self.fetch()
+
+        # indicators are declared on the shared registry, strategies
+        # asking for the same indicator of the same series share it
+        self.registry = registry
+        self.series = (self.market, 'M1')
 
-        self.ema = Indicator('ema', talib.EMA, timeperiod=20)
-        self.ema.update(self.init)
+        self.ema = registry.register(
+            self.series, 'ema', talib.EMA, timeperiod=20)
+        self.ema3 = registry.register(
+            self.series, 'ema3', talib.EMA, timeperiod=50)
+        self.ema4 = registry.register(
+            self.series, 'ema4', talib.EMA, timeperiod=100)
 
-        self.ema3 = Indicator('ema3', talib.EMA, timeperiod=50)
-        self.ema3.update(self.init)
+        self.loop_fill(self.init)
 
-        self.ema4 = Indicator('ema4', talib.EMA, timeperiod=100)
-        self.ema4.update(self.init)
+    def fetch(self):
+        # Newest max_period bars from the local bar store, influx is
+        # only queried when nothing was stored locally
+        frame = self.store.tail('M1', self.max_period)
+        if len(frame) == 0:
+            frame = self.client.query(
+                f"SELECT open,high,low,close from {self.market} \
+                LIMIT {self.max_period}"
+            ).get(self.monitor)
+        return frame.dropna()
 
     def loop_fill(self, frame):
-        for ind in [self.ema, self.ema3, self.ema4]:
-            ind.update(frame)
+        self.registry.update({self.series: frame})
 
     def loop_subscribe(self):
         self.ctx = zmq.Context()
@@ -48,30 +68,23 @@ class Strategy1:
         self.sub.connect("tcp://localhost:45600")
         self.sub.subscribe(self.market)
 
-        while True:
-            try:
-                m = self.sub.recv()
-                if m != b'':
-                    if m == b'EURUSD kill':
-                        self.kill_sockets()
-                        break
-                    if m == b'EURUSD':
-                        self.init = self.client.query(
-                            f"select open,high,low,close from\
-                             {self.market} LIMIT \
-                            {self.max_period}").get(
-                            self.monitor).dropna()
-
-                        self.loop_fill(self.init)
-                        self.algo(self.init)
-            except zmq.error.Again:
-                pass
-            except KeyboardInterrupt:
-                self.kill_sockets()
-                break
-            except Exception:
-                self.kill_sockets()
-                raise Exception
+        loop = EventLoop()
+        loop.register(self.sub, self.on_message)
+        try:
+            loop.run()
+        finally:
+            self.kill_sockets()
+
+    def on_message(self, frames):
+        # Event loop handler, returns False on the kill code to stop it
+        m = frames[0]
+        if m == b'EURUSD kill':
+            return False
+        if m == b'EURUSD':
+            self.init = self.fetch()
+
+            self.loop_fill(self.init)
+            self.algo(self.init)
 
     def kill_sockets(self):
         self.sub.close()
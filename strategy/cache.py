@@ -0,0 +1,121 @@
+
+################# REGULAR PYTHON IMPORTS ##################
+from collections import OrderedDict
+from threading import Lock
+
+################# LIBRARY IMPORTS ##################
+
+import numpy as np
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(x) for x in value)
+    return getattr(value, 'nbytes', 64)
+
+
+def _freeze(value):
+    # Cached arrays are shared by every caller, none of them may change it
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (tuple, list)):
+        for x in value:
+            _freeze(x)
+    return value
+
+
+class IndicatorCache:
+
+    """
+    Memoized results of indicator functions, keyed by
+
+        (series id, series version, function, params)
+
+    where the version is anything that changes when a series gets a new
+    bar, usually the time of its last bar. Asking for the same function
+    with the same params on the same version of a series is a dictionary
+    lookup, the function runs only on a miss, its arrays are returned
+    read only since every caller shares them. A new version of a series
+    drops every entry of its older versions, and least recently used
+    entries are evicted once their arrays exceed the memory budget.
+
+    [INIT VALUES]
+
+    1. budget :== bytes of results kept at most
+
+    """
+
+    def __init__(self, budget=64 * 2 ** 20):
+        self.budget = budget
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self):
+        return (
+            f'<IndicatorCache {len(self)} entries {self.nbytes} bytes '
+            f'hits={self.hits} misses={self.misses}>')
+
+    def get(self, series, version, func, inputs, **params):
+        """
+            Returns func(*inputs, **params) for that version of series.
+            inputs is a sequence of arrays, or a callable returning one so
+            the arrays are only extracted on a miss
+        """
+
+        key = (series, version, func, tuple(sorted(params.items())))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            if self._versions.get(series, version) != version:
+                self._invalidate(series)
+            self._versions[series] = version
+
+        value = _freeze(
+            func(*(inputs() if callable(inputs) else inputs), **params))
+
+        with self._lock:
+            size = _nbytes(value)
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self.nbytes += size
+            while self.nbytes > self.budget and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+        return value
+
+    def _invalidate(self, series):
+        for key in [x for x in self._entries if x[0] == series]:
+            self.nbytes -= self._entries.pop(key)[1]
+
+    def invalidate(self, series=None):
+        # Drops the entries of a series, or of every series
+        with self._lock:
+            if series is None:
+                self._entries.clear()
+                self._versions.clear()
+                self.nbytes = 0
+            else:
+                self._invalidate(series)
+                self._versions.pop(series, None)
+
+
+# cache shared by every strategy and backtest of this process
+cache = IndicatorCache()
@@ -1,5 +1,8 @@
 import numpy as np
 
+from tradex.market.buffers import RingBuffer
+from tradex.strategy.streaming import engine_for
+
 
 class Indicator:
     """This Indicator is a wrapper for Talib indicator library,
@@ -20,15 +23,28 @@ class Indicator:
     else you would receive another error as the arguments to unpack,
     might be too small or large....
 
-    NOTE: The returned values must be a numpy array as appends to
-    a numpy array expects a numpy as array as second argument..
-
     NOTE: The returned values matches exactly what the talib function
     returns but in an ascending order --> v1,v2...vn
     so if talib.MACD returns [macd,hist,signal] as 3 returns
-    then the equivalent v1,v2,v3 would match this exactly"""
+    then the equivalent v1,v2,v3 would match this exactly
+
+    NOTE: update() only feeds the rows of the frame that are newer than
+    the last row it saw (by index) into an incremental engine, so each
+    new bar costs O(1) instead of rerunning the function over the whole
+    history. EMA, SMA, RSI, MACD, STOCH, ADX, DEMA, TEMA, ATR, NATR, OBV
+    and AD are streamed exactly, any other function is rerun over a
+    bounded window of history ("window" rows at least), exact for
+    memoryless functions (WMA, BBANDS, MAX, ...) and within a tiny drift
+    for the others, see strategy.streaming
+
+    NOTE: Outputs live in one preallocated (no, capacity) float64 buffer,
+    v1..vN (or the names passed in "names") are read only views of it
+    and "values" views every output at once. The buffer doubles when it
+    fills up, or keeps only the newest "maxlen" values if maxlen is set"""
 
-    def __init__(self, name, func, lis=['close'], no=1, **kwargs):
+    def __init__(
+            self, name, func, lis=['close'], no=1, window=None,
+            names=None, capacity=256, maxlen=None, **kwargs):
         """BIG WARNING "no" argument must be greater than 0 and an integer
         No matter what...!!!"""
 
@@ -37,27 +53,74 @@ class Indicator:
         self.kwargs = kwargs
         self.name = name
         self.lis = lis
+        self.engine = engine_for(func, len(lis), kwargs, window)
+        # index of the newest row fed to the engine
+        self.last = None
 
-        if no > 1:
-            for i in range(1, no + 1):
-                exec(f"self.v{i} = np.array([], dtype=np.float64)")
-        else:
-            self.v1 = np.array([], dtype=np.float64)
+        self.names = list(names) if names else []
+        if self.names and len(self.names) != no:
+            raise ValueError("Pass one name per indicator output")
+
+        self.maxlen = maxlen
+        self._store = RingBuffer(
+            maxlen or capacity, [f'v{i}' for i in range(1, no + 1)])
+
+    def __getattr__(self, attr):
+        # v1..vN and the output names, as views of the output buffer
+        store = self.__dict__.get('_store')
+        if store is not None:
+            if attr in store.columns:
+                return store.column(attr)
+            if attr in self.__dict__['names']:
+                return store.view()[self.names.index(attr)]
+        raise AttributeError(attr)
+
+    def __len__(self):
+        return len(self._store)
+
+    @property
+    def values(self):
+        # (no, n) read only view of every output
+        return self._store.view()
+
+    def _reserve(self, count):
+        # Doubles the buffer until count more values fit (unless bounded)
+        store = self._store
+        if self.maxlen is None and len(store) + count > store.capacity:
+            capacity = store.capacity
+            while len(store) + count > capacity:
+                capacity *= 2
+            store.resize(capacity)
 
     def update(self, args, u=False):
-        _r = [args[x].values for x in args[self.lis].columns]
-        #  Logic for if no. of returns is specified as only 1
-        if self.r == 1:
-            arr = self.func(*_r, **self.kwargs)
-            arr = arr if u else arr[-1]
-            self.v1 = np.append(self.v1, arr)
+        """Feeds the rows of args newer than the last update to the engine
+        and appends the value of the newest one, or of every new row if u
+        """
+
+        self.feed({x: args[x].values for x in self.lis}, args.index, u)
+
+    def feed(self, columns, index, u=False):
+        # update() over already extracted columns ({name: array}) sharing
+        # one index, lets many indicators reuse the same arrays
+        start = 0
+        if self.last is not None:
+            start = index.searchsorted(self.last, side='right')
+        if start >= len(index):
             return
+        self.last = index[-1]
+
+        _r = [columns[x][start:] for x in self.lis]
+        out = self.engine.update(*_r)
+        if len(out) != self.r:
+            raise ValueError(
+                f"{self.name} returns {len(out)} values, not {self.r}")
 
-        # Logic for if no. of returns is > 1
-        exec(f"a = self.func(*_r, **self.kwargs)")
-        for x, y in enumerate(eval("a")):
-            y = y if u else y[-1]
-            exec(f"self.v{x + 1} = np.append(self.v{x + 1},y)")
+        if u:
+            self._reserve(len(out[0]))
+            self._store.extend(np.vstack(out))
+        else:
+            self._reserve(1)
+            self._store.append(*[y[-1] for y in out])
 
     def __repr__(self):
         return f"<custom {self.name} indicator {hex(id(self))}>"
@@ -0,0 +1,131 @@
+
+################# REGULAR PYTHON IMPORTS ##################
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+################# Object IMPORTS ##################
+
+from tradex.strategy.indicators import Indicator
+
+
+IndicatorSpec = namedtuple(
+    'IndicatorSpec', ['series', 'func', 'lis', 'kwargs', 'window'])
+
+
+def spec_of(series, func, lis=('close',), window=None, **kwargs):
+    # Hashable description of an indicator, equal specs share one Indicator
+    return IndicatorSpec(
+        series, func, tuple(lis), tuple(sorted(kwargs.items())), window)
+
+
+class IndicatorRegistry:
+
+    """
+    Computes a declared set of indicators for many series in batched
+    passes, a series being any hashable key, usually (pair, timeframe).
+
+    register() deduplicates specs, two strategies asking for EMA(50) on
+    ('EURUSD', 'M5') get the very same Indicator back. update() takes the
+    newest frame of every series, extracts each OHLC column once and
+    feeds it to every indicator of that series, a series whose newest
+    bar was already computed is skipped (per bar cache).
+
+    The registry is safe to share between threads: every series is
+    updated under its own lock, so concurrent update() calls for the same
+    series feed each bar once, and different series still run in
+    parallel.
+
+    [INIT VALUES]
+
+    1. workers :== series are updated over a thread pool of that many
+    threads when > 1 (TA-Lib releases the GIL), else in this thread
+
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self._indicators = {}
+        self._series = {}
+        self._computed = {}
+        self._pool = None
+
+        # guards the dicts above, and one lock per series guards its
+        # indicators while they are fed
+        self._lock = Lock()
+        self._locks = {}
+
+    def register(
+            self, series, name, func, lis=['close'], no=1, window=None,
+            **kwargs):
+        """
+            Returns the Indicator of the spec, created on first request.
+            Arguments are the ones of Indicator plus the series it reads
+        """
+
+        key = spec_of(series, func, lis, window, **kwargs)
+        with self._lock:
+            lock = self._locks.setdefault(series, Lock())
+
+        with lock, self._lock:
+            if key not in self._indicators:
+                indicator = Indicator(
+                    name, func, lis=list(lis), no=no, window=window,
+                    **kwargs)
+                self._indicators[key] = indicator
+                self._series.setdefault(series, []).append(indicator)
+                # a new indicator has not seen the current bar yet
+                self._computed.pop(series, None)
+            return self._indicators[key]
+
+    def indicators(self, series=None):
+        with self._lock:
+            if series is None:
+                return list(self._indicators.values())
+            return list(self._series.get(series, []))
+
+    def _update_series(self, series, frame):
+        if len(frame) == 0:
+            return
+
+        with self._locks[series]:
+            if self._computed.get(series) == frame.index[-1]:
+                return
+
+            indicators = self._series[series]
+            names = {x for indicator in indicators for x in indicator.lis}
+            columns = {x: frame[x].values for x in names}
+
+            for indicator in indicators:
+                indicator.feed(columns, frame.index)
+            self._computed[series] = frame.index[-1]
+
+    def update(self, frames):
+        """
+            Brings every indicator up to date, frames maps a series to its
+            newest frame of bars (a growing history or a rolling window)
+        """
+
+        with self._lock:
+            jobs = [(x, y) for x, y in frames.items() if x in self._series]
+            if self.workers and self.workers > 1 and len(jobs) > 1:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.workers)
+            pool = self._pool
+
+        if pool is not None and len(jobs) > 1:
+            # list() re-raises the first failure
+            list(pool.map(lambda job: self._update_series(*job), jobs))
+        else:
+            for series, frame in jobs:
+                self._update_series(series, frame)
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+# registry shared by the live strategies of this process
+registry = IndicatorRegistry()
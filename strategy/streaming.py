@@ -0,0 +1,486 @@
+
+################# REGULAR PYTHON IMPORTS ##################
+from collections import deque
+
+################# LIBRARY IMPORTS ##################
+
+import numpy as np
+import talib
+from talib import abstract
+
+NAN = float('nan')
+
+
+def _is_zero(value):
+    # TA_IS_ZERO of TA-Lib
+    return -0.00000001 < value < 0.00000001
+
+
+class SMA:
+
+    # Streaming TA-Lib SMA, a running total over the last timeperiod values
+
+    outputs = 1
+
+    def __init__(self, timeperiod=30):
+        self.period = timeperiod
+        self._window = deque()
+        self._total = 0.0
+
+    def update(self, value):
+        self._window.append(value)
+        self._total += value
+        if len(self._window) < self.period:
+            return (NAN,)
+        out = self._total / self.period
+        self._total -= self._window.popleft()
+        return (out,)
+
+
+class EMA:
+
+    """
+    Streaming TA-Lib EMA, seeded with the SMA of the first timeperiod
+    values then smoothed with k = 2 / (timeperiod + 1)
+    """
+
+    outputs = 1
+
+    def __init__(self, timeperiod=30, seed=None):
+        self.period = timeperiod
+        self.k = 2.0 / (timeperiod + 1)
+        self.value = seed
+        self._count = 0
+        self._total = 0.0
+
+    def update(self, value):
+        if self.value is None:
+            self._total += value
+            self._count += 1
+            if self._count < self.period:
+                return (NAN,)
+            self.value = self._total / self.period
+            return (self.value,)
+
+        self.value = ((value - self.value) * self.k) + self.value
+        return (self.value,)
+
+
+class RSI:
+
+    # Streaming TA-Lib RSI (Wilder smoothing of gains and losses)
+
+    outputs = 1
+
+    def __init__(self, timeperiod=14):
+        self.period = timeperiod
+        self._previous = None
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def _value(self):
+        total = self._gain + self._loss
+        return 100 * (self._gain / total) if not _is_zero(total) else 0.0
+
+    def update(self, value):
+        previous, self._previous = self._previous, value
+        if previous is None:
+            return (NAN,)
+
+        diff = value - previous
+        self._count += 1
+
+        if self._count <= self.period:
+            if diff < 0:
+                self._loss -= diff
+            else:
+                self._gain += diff
+            if self._count < self.period:
+                return (NAN,)
+            self._loss /= self.period
+            self._gain /= self.period
+            return (self._value(),)
+
+        self._loss *= (self.period - 1)
+        self._gain *= (self.period - 1)
+        if diff < 0:
+            self._loss -= diff
+        else:
+            self._gain += diff
+        self._loss /= self.period
+        self._gain /= self.period
+        return (self._value(),)
+
+
+class MACD:
+
+    """
+    Streaming TA-Lib MACD. As in TA-Lib both emas start on the same bar:
+    the slow ema is seeded with the first slowperiod values, the fast one
+    with the last fastperiod values of that same window
+    """
+
+    outputs = 3
+
+    def __init__(self, fastperiod=12, slowperiod=26, signalperiod=9):
+        if slowperiod < fastperiod:
+            fastperiod, slowperiod = slowperiod, fastperiod
+        self.fast = EMA(fastperiod)
+        self.slow = EMA(slowperiod)
+        self.signal = EMA(signalperiod)
+        self._seed = deque(maxlen=fastperiod)
+
+    def update(self, value):
+        if self.slow.value is None:
+            self._seed.append(value)
+            slow, = self.slow.update(value)
+            if slow != slow:
+                return (NAN, NAN, NAN)
+            total = 0.0
+            for x in self._seed:
+                total += x
+            self.fast.value = total / self.fast.period
+            fast = self.fast.value
+        else:
+            fast, = self.fast.update(value)
+            slow, = self.slow.update(value)
+
+        macd = fast - slow
+        signal, = self.signal.update(macd)
+        if signal != signal:
+            return (NAN, NAN, NAN)
+        return (macd, signal, macd - signal)
+
+
+class STOCH:
+
+    """
+    Streaming TA-Lib STOCH with simple moving averages for the slow
+    lines (slowk_matype = slowd_matype = 0), the only case streamed
+    """
+
+    outputs = 2
+
+    def __init__(
+            self, fastk_period=5, slowk_period=3, slowk_matype=0,
+            slowd_period=3, slowd_matype=0):
+        if slowk_matype or slowd_matype:
+            raise ValueError("Only simple moving averages are streamed")
+        self._highs = deque(maxlen=fastk_period)
+        self._lows = deque(maxlen=fastk_period)
+        self.slowk = SMA(slowk_period)
+        self.slowd = SMA(slowd_period)
+
+    def update(self, high, low, close):
+        self._highs.append(high)
+        self._lows.append(low)
+        if len(self._highs) < self._highs.maxlen:
+            return (NAN, NAN)
+
+        lowest = min(self._lows)
+        diff = (max(self._highs) - lowest) / 100.0
+        fastk = (close - lowest) / diff if diff != 0 else 0.0
+
+        slowk, = self.slowk.update(fastk)
+        if slowk != slowk:
+            return (NAN, NAN)
+        slowd, = self.slowd.update(slowk)
+        if slowd != slowd:
+            return (NAN, NAN)
+        return (slowk, slowd)
+
+
+class ADX:
+
+    # Streaming TA-Lib ADX (Wilder smoothing of +DM, -DM and true range)
+
+    outputs = 1
+
+    def __init__(self, timeperiod=14):
+        self.period = timeperiod
+        self._count = 0
+        self._previous = None
+        self._plus = self._minus = self._range = 0.0
+        self._dx = 0.0
+        self.value = None
+
+    def update(self, high, low, close):
+        previous, self._previous = self._previous, (high, low, close)
+        if previous is None:
+            return (NAN,)
+
+        prev_high, prev_low, prev_close = previous
+        period = self.period
+        self._count += 1
+
+        diff_plus = high - prev_high
+        diff_minus = prev_low - low
+        true_range = max(
+            high - low, abs(high - prev_close), abs(low - prev_close))
+
+        # first period - 1 bars only accumulate, then Wilder smoothing
+        if self._count >= period:
+            self._minus -= self._minus / period
+            self._plus -= self._plus / period
+            self._range = self._range - (self._range / period) + true_range
+        else:
+            self._range += true_range
+
+        if diff_minus > 0 and diff_plus < diff_minus:
+            self._minus += diff_minus
+        elif diff_plus > 0 and diff_plus > diff_minus:
+            self._plus += diff_plus
+
+        if self._count < period:
+            return (NAN,)
+
+        dx = None
+        if not _is_zero(self._range):
+            minus = 100.0 * (self._minus / self._range)
+            plus = 100.0 * (self._plus / self._range)
+            total = minus + plus
+            if not _is_zero(total):
+                dx = 100.0 * (abs(minus - plus) / total)
+
+        if self.value is None:
+            if dx is not None:
+                self._dx += dx
+            if self._count < 2 * period - 1:
+                return (NAN,)
+            self.value = self._dx / period
+        elif dx is not None:
+            self.value = ((self.value * (period - 1)) + dx) / period
+
+        return (self.value,)
+
+
+class DEMA:
+
+    # Streaming TA-Lib DEMA, 2 * ema - ema(ema), each ema seeded with SMA
+
+    outputs = 1
+    weights = (2.0, -1.0)
+
+    def __init__(self, timeperiod=30):
+        self.emas = [EMA(timeperiod) for _ in self.weights]
+
+    def update(self, value):
+        total = 0.0
+        for ema, weight in zip(self.emas, self.weights):
+            value, = ema.update(value)
+            if value != value:
+                return (NAN,)
+            total += weight * value
+        return (total,)
+
+
+class TEMA(DEMA):
+
+    # Streaming TA-Lib TEMA, 3 * ema - 3 * ema(ema) + ema(ema(ema))
+
+    weights = (3.0, -3.0, 1.0)
+
+
+class ATR:
+
+    """
+    Streaming TA-Lib ATR, the first value is the mean of the first
+    timeperiod true ranges then Wilder smoothing
+    """
+
+    outputs = 1
+
+    def __init__(self, timeperiod=14):
+        self.period = timeperiod
+        self._previous = None
+        self._count = 0
+        self._total = 0.0
+        self.value = None
+
+    def update(self, high, low, close):
+        previous, self._previous = self._previous, close
+        if previous is None:
+            return (NAN,)
+
+        true_range = max(high - low, abs(high - previous), abs(low - previous))
+        if self.period <= 1:
+            return (true_range,)
+
+        if self.value is None:
+            self._count += 1
+            self._total += true_range
+            if self._count < self.period:
+                return (NAN,)
+            self.value = self._total / self.period
+            return (self.value,)
+
+        self.value = (
+            (self.value * (self.period - 1)) + true_range) / self.period
+        return (self.value,)
+
+
+class NATR(ATR):
+
+    # Streaming TA-Lib NATR, ATR as a percentage of the close
+
+    def update(self, high, low, close):
+        value, = ATR.update(self, high, low, close)
+        if value != value:
+            return (NAN,)
+        return ((value / close) * 100.0 if not _is_zero(close) else 0.0,)
+
+
+class OBV:
+
+    # Streaming TA-Lib OBV, a running total of the volume since row one
+
+    outputs = 1
+
+    def __init__(self):
+        self._previous = None
+        self.value = None
+
+    def update(self, close, volume):
+        if self.value is None:
+            self.value = volume
+        elif close > self._previous:
+            self.value += volume
+        elif close < self._previous:
+            self.value -= volume
+        self._previous = close
+        return (self.value,)
+
+
+class AD:
+
+    # Streaming TA-Lib AD (Chaikin accumulation/distribution line)
+
+    outputs = 1
+
+    def __init__(self):
+        self.value = 0.0
+
+    def update(self, high, low, close, volume):
+        spread = high - low
+        if spread > 0.0:
+            self.value += (((close - low) - (high - close)) / spread) * volume
+        return (self.value,)
+
+
+KERNELS = {
+    'SMA': SMA, 'EMA': EMA, 'RSI': RSI,
+    'MACD': MACD, 'STOCH': STOCH, 'ADX': ADX,
+    'DEMA': DEMA, 'TEMA': TEMA, 'ATR': ATR, 'NATR': NATR,
+    'OBV': OBV, 'AD': AD,
+}
+
+
+class Streaming:
+
+    # Feeds new rows one by one into a streaming kernel, O(1) per row
+
+    def __init__(self, kernel):
+        self.kernel = kernel
+        self.outputs = kernel.outputs
+
+    def update(self, *arrays):
+        rows = [self.kernel.update(*x) for x in zip(*(
+            np.asarray(a, dtype=np.float64).tolist() for a in arrays))]
+        out = np.array(rows, dtype=np.float64).reshape(-1, self.outputs)
+        return list(out.T)
+
+
+# Functions whose value at a bar only depends on their last lookback + 1
+# rows (no recursion, no running total), the only ones Windowed bounds.
+# Moving average types among them only stay memoryless as SMA or WMA,
+# MAXINDEX and the like are left out as they return absolute positions
+MEMORYLESS = frozenset([
+    'SMA', 'WMA', 'TRIMA', 'MAX', 'MIN', 'MINMAX', 'SUM', 'MIDPOINT',
+    'MIDPRICE', 'STDDEV', 'VAR',
+    'BBANDS', 'MA', 'LINEARREG', 'LINEARREG_ANGLE', 'LINEARREG_INTERCEPT',
+    'LINEARREG_SLOPE', 'TSF', 'CORREL', 'BETA', 'MOM', 'ROC', 'ROCP',
+    'ROCR', 'ROCR100', 'WILLR', 'AROON', 'AROONOSC', 'CCI', 'TRANGE',
+    'AVGPRICE', 'MEDPRICE', 'TYPPRICE', 'WCLPRICE', 'BOP',
+])
+MEMORYLESS_MATYPES = (0, 2)
+
+
+def memoryless(func, kwargs):
+    name = getattr(func, '__name__', None)
+    if name not in MEMORYLESS or getattr(talib, name, None) is not func:
+        return False
+    return all(
+        value in MEMORYLESS_MATYPES
+        for key, value in kwargs.items() if key.endswith('matype'))
+
+
+# Rows every stateful function (KAMA, SAR, ADXR, TRIX, MA of EMA type...)
+# is rerun over on top of its lookback, 10 times the lookback when that
+# is longer. The state they carry from the first row fades away over
+# them: values drift from a whole history run by 1e-9 (relative) or
+# less for the usual periods, a larger "window" gets closer
+SETTLE = 500
+
+
+class Windowed:
+
+    """
+    Fallback for functions without a streaming kernel: the function is
+    rerun over the new rows plus a bounded window of history, so a bar
+    costs the same whatever the length of the history. Functions without
+    memory (MEMORYLESS: SMA, WMA, MAX/MIN, BBANDS, ...) only need their
+    TA-Lib lookback and are exact over it. Any other one keeps its
+    lookback plus SETTLE rows (see above) and drifts by a tiny amount,
+    the running totals (OBV, AD) are streamed exactly instead. "window"
+    rows are kept at least, functions TA-Lib does not know keep their
+    whole history unless given one.
+    """
+
+    def __init__(self, func, inputs, kwargs, window=None):
+        self.func = func
+        self.kwargs = kwargs
+        self.window = window
+        try:
+            info = abstract.Function(func.__name__, **kwargs)
+        except Exception:
+            pass
+        else:
+            needed = info.lookback + 1
+            if not memoryless(func, kwargs):
+                needed += max(SETTLE, 10 * needed)
+            self.window = max(window or 0, needed)
+        self._history = [np.empty(0) for _ in range(inputs)]
+
+    def update(self, *arrays):
+        count = len(arrays[0])
+        data = [
+            np.concatenate([old, np.asarray(new, dtype=np.float64)])
+            for old, new in zip(self._history, arrays)]
+
+        out = self.func(*data, **self.kwargs)
+        out = [out] if isinstance(out, np.ndarray) else list(out)
+
+        if self.window is not None:
+            keep = self.window - 1
+            data = [x[max(len(x) - keep, 0):] for x in data]
+        self._history = data
+
+        return [np.asarray(x, dtype=np.float64)[-count:] for x in out]
+
+
+def engine_for(func, inputs, kwargs, window=None):
+    """
+        Returns the incremental engine of a TA-Lib function: a streaming
+        kernel when there is one for the function and its arguments, else
+        recomputation over a bounded window of history (see Windowed). engine.update(*new_columns) returns one
+        array per output holding the values of the new rows
+    """
+
+    kernel = KERNELS.get(getattr(func, '__name__', None))
+    if kernel is not None and getattr(talib, func.__name__, None) is func:
+        try:
+            return Streaming(kernel(**kwargs))
+        except (TypeError, ValueError):
+            pass
+    return Windowed(func, inputs, kwargs, window)
@@ -2,23 +2,37 @@ import pandas as pd
 
 from tradex.market.base import MarketPair
 from tradex.market.metatrader import MarketParser
+from tradex.market.writer import WriteBehindQueue
+from tradex.market.buffers import BarWindow
+from tradex.market.bars import Rollup, TIMEFRAMES
 from tradex.config import MOCK_SUB_PORT, MOCK_ROUTER_PORT
 # import zmq
 
 
 class MockedMarketPair(MarketPair):
 
+    M1 = property(lambda self: self.windows['M1'].to_frame())
+
+    queue_bar = MarketParser.queue_bar
+    validate_tick_crossing = MarketParser.validate_tick_crossing
+
     def __init__(self, pair, sub=MOCK_SUB_PORT, router=MOCK_ROUTER_PORT):
 
         super().__init__(
             pair=pair, sub_port=sub, router_port=router
         )
 
-        self.M1 = pd.DataFrame(
+        self.windows = {x: BarWindow(100) for x in TIMEFRAMES}
+        self.rollup = Rollup()
+        self.windows['M1'].extend_frame(pd.DataFrame(
             {'open': [1.4567], 'high': [3.4567],
                 'low': [0.9800], 'close': [1.4532]}
             , index=pd.to_datetime(['2019-09-08 01:00:00'])
-        )
+        ))
+
+        # bars received by main_logic are collected instead of persisted
+        self.persisted = []
+        self.write_behind = WriteBehindQueue(self.persisted.extend)
 
     def logic_contained(self):
 
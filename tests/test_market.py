@@ -4,6 +4,7 @@ from tradex.market.fetch_history_hst import parse_hst
 from mocked_classes import MockedMarketPair
 
 import pandas as pd
+import numpy as np
 import os
 from tradex.mock_server import publish, req_response
 from threading import Thread
@@ -97,3 +98,700 @@ def test_assert_return_type():
     assert type(parse_hst('test.txt')) == pd.core.frame.DataFrame
     os.remove('test.txt')
 
+
+#################  TICK STORE RING BUFFER #######################
+
+def test_tick_store_wraps_and_keeps_capacity():
+    from tradex.market.buffers import TickStore
+
+    store = TickStore(capacity=4)
+    for i in range(10):
+        store.append(60.0 + i, 1.0 + i, 2.0 + i)
+
+    assert len(store) == 4
+    assert list(store.column('time')) == [66.0, 67.0, 68.0, 69.0]
+    assert store.last('bid') == 10.0
+    assert store.column('bid').flags['C_CONTIGUOUS']
+
+
+def test_tick_store_minute_view():
+    from tradex.market.buffers import TickStore
+
+    store = TickStore(capacity=8)
+    for stamp, bid in [(59.5, 1.0), (60.0, 1.2), (90.0, 1.1), (119.9, 1.3),
+                       (120.0, 1.4)]:
+        store.append(stamp, bid, bid + 0.0002)
+
+    times, bid, _ = store.minute(75.0)
+    assert list(times) == [60.0, 90.0, 119.9]
+    assert list(bid) == [1.2, 1.1, 1.3]
+
+
+#################  STREAMING BAR BUILDER #######################
+
+def test_bar_builder_closes_bars_across_gaps():
+    from tradex.market.bars import BarBuilder
+
+    builder = BarBuilder(60)
+    assert builder.update(3599.0, 1.0) is None
+    assert builder.update(3599.5, 1.2) is None
+
+    # Next tick comes three minutes later and after the hour rollover
+    bar = builder.update(3780.0, 1.1)
+    assert bar == (3540, 1.0, 1.2, 1.0, 1.2, 2)
+    assert builder.bar == (3780, 1.1, 1.1, 1.1, 1.1, 1)
+
+
+def test_bar_aggregator_emits_every_timeframe():
+    from tradex.market.bars import BarAggregator
+
+    agg = BarAggregator(['M1', 'M5', 'H1'])
+    assert agg.update(0.0, 1.0) == []
+    assert agg.update(30.0, 3.0) == []
+    assert agg.update(61.0, 0.5) == [('M1', (0, 1.0, 3.0, 1.0, 3.0, 2))]
+
+    finished = agg.update(3600.0, 1.5)
+    assert [name for name, _ in finished] == ['M1', 'M5', 'H1']
+    assert finished[1][1] == (0, 1.0, 3.0, 0.5, 0.5, 3)
+    assert finished[2][1] == (0, 1.0, 3.0, 0.5, 0.5, 3)
+
+
+#################  VECTORIZED GAP FILLING #######################
+
+def test_fill_gaps_skips_forex_weekend():
+    from tradex.market.frames import fill_gaps, forex_session
+
+    # Friday 21:58 UTC till Sunday 22:01 UTC with nothing in between
+    index = pd.to_datetime([
+        '2019-09-06 21:58', '2019-09-06 22:00',
+        '2019-09-08 22:00', '2019-09-08 22:02'])
+    frame = pd.DataFrame(
+        {'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0}, index=index)
+
+    filled, count = fill_gaps(frame, 60, forex_session)
+    assert count == 2
+    assert list(filled.index[filled['open'].isna()]) == list(pd.to_datetime(
+        ['2019-09-06 21:59', '2019-09-08 22:01']))
+
+    everything, count = fill_gaps(frame, 60)
+    assert count == len(everything) - 4 == 2 * 24 * 60 + 1
+
+
+#################  OHLC RESAMPLING KERNELS #######################
+
+def test_resample_all_builds_every_timeframe_from_m1():
+    from tradex.market.frames import resample_all
+
+    index = pd.date_range(
+        '2019-09-09 00:00', periods=20, freq=pd.Timedelta(minutes=1))
+    frame = pd.DataFrame({
+        'open': np.arange(20, dtype=float),
+        'high': np.arange(20, dtype=float) + 2,
+        'low': np.arange(20, dtype=float) - 1,
+        'close': np.arange(20, dtype=float) + 1}, index=index)
+    frame.iloc[7] = np.nan
+
+    r = resample_all(frame, ['M5', 'M15'])
+
+    assert list(r['M5'].index) == list(index[::5])
+    assert list(r['M5'].iloc[0]) == [0.0, 6.0, -1.0, 5.0]
+    assert r['M5'].iloc[1].isna().all()
+    assert r['M15'].iloc[0].isna().all()
+    assert list(r['M15'].iloc[1]) == [15.0, 21.0, 14.0, 20.0]
+
+
+
+def test_resampling_across_the_weekend_gives_no_zero_bars():
+    from tradex.market.frames import fill_gaps, forex_session, resample_all
+
+    # Friday 20:00 till Sunday 23:59 UTC of minutes, weekend left out
+    index = pd.date_range('2019-09-06 20:00', '2019-09-08 23:59', freq='60s')
+    index = index[forex_session(index)]
+    frame = pd.DataFrame(
+        {'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5}, index=index)
+
+    m1, filled = fill_gaps(frame, 60, forex_session)
+    assert filled == 0
+
+    r = resample_all(m1, ['M5', 'H1', 'H4'])
+    for x in r.values():
+        x.fillna(0, inplace=True)
+        assert (x != 0).all().all()
+
+    assert len(r['M5']) == 2 * 24
+    assert list(r['H1'].index) == list(pd.to_datetime([
+        '2019-09-06 20:00', '2019-09-06 21:00',
+        '2019-09-08 22:00', '2019-09-08 23:00']))
+    assert list(r['H4'].index) == list(pd.to_datetime([
+        '2019-09-06 20:00', '2019-09-08 20:00']))
+
+#################  MEMORY MAPPED HST READER #######################
+
+def write_hst(path, stamps):
+    import struct
+
+    with open(path, 'wb') as fp:
+        fp.write(b'\x00' * 148)
+        for i, stamp in enumerate(stamps):
+            fp.write(struct.pack(
+                '<Q4dqiq', stamp, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i,
+                10, 2, 0))
+
+
+def test_parse_hst_filters_by_year_and_range(tmp_path):
+    path = str(tmp_path / 'EURUSD1.hst')
+    # 2017-12-31 23:59, 2018-01-01 00:00 and the two minutes after it
+    write_hst(path, [1514764740, 1514764800, 1514764860, 1514764920])
+
+    frame = parse_hst(path, 2018)
+    assert list(frame.columns) == ['open', 'high', 'low', 'close']
+    assert list(frame['open']) == [2.0, 3.0, 4.0]
+    assert frame.index[0] == pd.Timestamp('2018-01-01 00:00')
+
+    frame = parse_hst(path, range1=1514764800, range2=1514764860)
+    assert list(frame['close']) == [2.5, 3.5]
+
+    # Repeated calls share no state
+    assert len(parse_hst(path, range1=1514764920)) == 1
+
+
+def test_iter_hst_seeks_and_streams_chunks(tmp_path):
+    from tradex.market.fetch_history_hst import iter_hst, read_hst
+
+    path = str(tmp_path / 'EURUSD1.hst')
+    write_hst(path, [60 * x for x in range(1, 11)])
+
+    chunks = list(iter_hst(path, start=150, end=480, chunk_size=2))
+    assert [len(x) for x in chunks] == [2, 2, 2]
+    assert list(pd.concat(chunks)['open']) == [3.0, 4.0, 5.0, 6.0, 7.0, 8.0]
+
+    assert len(read_hst(path, start=10000)) == 0
+    assert len(read_hst(path, end=120)) == 2
+
+
+#################  LOCAL COLUMNAR BAR STORE #######################
+
+def test_bar_store_partitions_by_day_and_merges(tmp_path):
+    from tradex.market.store import BarStore
+
+    store = BarStore('EURUSD', root=str(tmp_path))
+    index = pd.date_range(
+        '2019-09-08 23:58', periods=4, freq=pd.Timedelta(minutes=1),
+        tz='UTC')
+    frame = pd.DataFrame(
+        {'open': [1.0, 2.0, 3.0, 4.0], 'high': 5.0,
+         'low': 0.5, 'close': 1.5}, index=index)
+
+    store.write('M1', frame)
+    assert sorted(os.listdir(str(tmp_path / 'EURUSD' / 'M1'))) == [
+        '2019-09-08.npy', '2019-09-09.npy']
+
+    # Appending replaces bars stored at the same time
+    store.append('M1', frame.iloc[-1:] * 2)
+    stored = store.read('M1')
+    assert list(stored.index) == list(index)
+    assert list(stored['open']) == [1.0, 2.0, 3.0, 8.0]
+
+    assert list(store.read('M1', start=index[1], end=index[2])['open']) == \
+        [2.0, 3.0]
+    assert list(store.tail('M1', 3)['open']) == [2.0, 3.0, 8.0]
+
+    store.drop()
+    assert len(store.read('M1')) == 0
+
+
+def test_bar_store_appends_newer_bars_without_rewriting_the_day(tmp_path):
+    from tradex.market.store import BarStore
+
+    store = BarStore('EURUSD', root=str(tmp_path))
+    folder = tmp_path / 'EURUSD' / 'M1'
+    index = pd.date_range(
+        '2019-09-09 10:00', periods=6, freq=pd.Timedelta(minutes=1),
+        tz='UTC')
+    frame = pd.DataFrame(
+        {'open': np.arange(6.0), 'high': 5.0, 'low': 0.5, 'close': 1.5},
+        index=index)
+
+    store.write('M1', frame.iloc[:3])
+    day = (folder / '2019-09-09.npy').read_bytes()
+
+    # live bars newer than the day only go to its tail file
+    store.append('M1', frame.iloc[3:4])
+    store.append('M1', frame.iloc[4:])
+    assert (folder / '2019-09-09.npy').read_bytes() == day
+    assert (folder / '2019-09-09.tail').stat().st_size == 3 * 5 * 8
+    assert list(store.read('M1')['open']) == list(np.arange(6.0))
+    assert list(store.tail('M1', 2)['open']) == [4.0, 5.0]
+
+    # a replaced bar is merged, the tail goes into the day file
+    store.append('M1', frame.iloc[4:5] * 2)
+    assert not (folder / '2019-09-09.tail').exists()
+    assert list(store.read('M1')['open']) == [0.0, 1.0, 2.0, 3.0, 8.0, 5.0]
+
+    # a bar cut short by a crash is ignored
+    store.append('M1', frame.iloc[5:].shift(1, freq='60s'))
+    with open(str(folder / '2019-09-09.tail'), 'ab') as fp:
+        fp.write(b'\x00' * 12)
+    assert list(store.read('M1')['open'])[-2:] == [5.0, 5.0]
+    assert len(store.read('M1')) == 7
+    store.append('M1', frame.iloc[5:].shift(2, freq='60s') * 3)
+    assert list(store.read('M1')['open'])[-3:] == [5.0, 5.0, 15.0]
+
+
+#################  LINE PROTOCOL WRITER #######################
+
+def test_line_protocol_batches_and_skips_nan_rows():
+    from tradex.market.writer import LineProtocolWriter, to_line_protocol
+
+    index = pd.date_range(
+        '2019-09-09', periods=5, freq=pd.Timedelta(minutes=1), tz='UTC')
+    frame = pd.DataFrame({
+        'open': [1.1, 1.2, np.nan, 1.4, 1.5], 'high': 2.0,
+        'low': 0.5, 'close': 1.0}, index=index)
+
+    lines = to_line_protocol(frame, 'M1')
+    assert len(lines) == 4
+    assert lines[0] == 'M1 open=1.1,high=2.0,low=0.5,close=1.0 1567987200'
+
+    class Client:
+        _database = 'EURUSD'
+        sent = []
+
+        def write(self, data, params, expected_response_code, protocol):
+            self.sent.append((len(data), params['db'], protocol))
+
+    writer = LineProtocolWriter(Client(), batch_size=3, workers=2)
+    report = writer.write(frame, 'M1')
+    assert (report.rows, report.batches) == (4, 2)
+    assert sorted(Client.sent) == [(1, 'EURUSD', 'line'), (3, 'EURUSD', 'line')]
+
+
+#################  WRITE BEHIND QUEUE #######################
+
+def test_write_behind_queue_batches_and_retries():
+    import time
+    from tradex.market.writer import WriteBehindQueue
+
+    written, calls = [], []
+
+    def sink(items):
+        calls.append(len(items))
+        if len(calls) == 1:
+            raise IOError('database is down')
+        written.extend(items)
+
+    wb = WriteBehindQueue(sink, flush_interval=0.05, batch_size=100).start()
+    for x in range(5):
+        wb.put(x)
+
+    time.sleep(0.3)
+    assert written == [0, 1, 2, 3, 4]
+    assert wb.failures == 1 and wb.written == 5 and wb.lag == 0.0
+
+    wb.put(5)
+    wb.close()
+    assert written[-1] == 5
+
+
+
+def test_write_behind_queue_backs_off_and_blocks_while_sink_is_down():
+    import queue
+    import time
+    from tradex.market.writer import WriteBehindQueue
+
+    written, down = [], [True]
+
+    def sink(items):
+        if down[0]:
+            raise IOError('database is down')
+        written.extend(items)
+
+    wb = WriteBehindQueue(
+        sink, flush_interval=0.05, batch_size=2, max_pending=3,
+        max_lag=0.05, max_backoff=0.2).start()
+
+    # the writer holds at most max_pending items, the queue as many more
+    with pytest.raises(queue.Full):
+        for x in range(100):
+            wb.put(x)
+    assert x <= 2 * 3 + 1
+
+    # retries back off instead of running on every dequeued item
+    time.sleep(0.5)
+    assert 2 <= wb.failures <= 6
+
+    down[0] = False
+    wb.close()
+    assert written == list(range(x))
+
+#################  ROLLING BAR WINDOW #######################
+
+def test_bar_window_rolls_and_resizes():
+    from tradex.market.buffers import BarWindow
+    from tradex.market.bars import Bar
+
+    window = BarWindow(3)
+    index = pd.date_range(
+        '2019-09-09', periods=4, freq=pd.Timedelta(minutes=1))
+    window.extend_frame(pd.DataFrame(
+        {'open': [1.0, 2.0, 3.0, 4.0], 'high': 5.0, 'low': 0.5,
+         'close': 1.5}, index=index))
+    window.append_bar(Bar(index[-1].value // 10 ** 9 + 60, 5.0, 6.0, 4.0,
+                          5.5, 10))
+
+    frame = window.to_frame()
+    assert list(frame['open']) == [3.0, 4.0, 5.0]
+    assert frame.index[-1] == pd.Timestamp('2019-09-09 00:04')
+
+    window.resize(5)
+    window.append(0, 6.0, 6.0, 6.0, 6.0)
+    assert list(window.column('open')) == [3.0, 4.0, 5.0, 6.0]
+    assert list(window.to_frame(2)['open']) == [5.0, 6.0]
+
+
+#################  MULTI TIMEFRAME ROLLUP #######################
+
+def test_rollup_closes_bars_on_the_last_minute_and_on_gaps():
+    from tradex.market.bars import Rollup, Bar
+
+    rollup = Rollup(['M5', 'H1'])
+    events = []
+    rollup.on_close(lambda name, bar: events.append((name, bar)))
+
+    for minute in range(5):
+        closed = rollup.update(Bar(minute * 60, 1.0 + minute, 2.0 + minute,
+                                   0.5, 1.5, 3))
+    assert closed == [('M5', (0, 1.0, 6.0, 0.5, 1.5, 15))]
+
+    # Gap straight into the next hour closes the open H1 bar first
+    closed = rollup.update(Bar(3600, 9.0, 9.5, 8.0, 9.2, 1))
+    assert closed == [('H1', (0, 1.0, 6.0, 0.5, 1.5, 15))]
+    assert events == [('M5', (0, 1.0, 6.0, 0.5, 1.5, 15))] + closed
+
+    # A repeated bar of a closed bucket is ignored
+    assert rollup.update(Bar(240, 1.0, 1.0, 1.0, 1.0, 1)) == []
+
+
+
+def test_warm_start_rebuilds_open_bars_from_stored_minutes(tmp_path):
+    from types import SimpleNamespace
+    from tradex.market.store import BarStore
+
+    store = BarStore('EURUSD', root=str(tmp_path))
+    minutes = pd.date_range(
+        '2019-09-09 04:00', '2019-09-09 05:59', freq='60s', tz='UTC')
+    stored = pd.DataFrame(
+        {'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5}, index=minutes)
+    stored.iloc[3, 1] = 9.0
+    store.write('M1', stored)
+
+    # the gap fetched after a restart starts at the last stored minute
+    gap = pd.DataFrame(
+        {'open': 1.5, 'high': 1.6, 'low': 1.4, 'close': 1.55},
+        index=pd.date_range(
+            '2019-09-09 05:59', periods=11, freq='60s', tz='UTC'))
+
+    parser = SimpleNamespace(store=store, database_name='EURUSD')
+    frame = MarketParser.warm_frame(parser, gap)
+    assert len(frame) == 120 + 11
+    r = MarketParser.fill_and_return_resampled_data(parser, frame)
+
+    # the open H4 and D1 bars cover the minutes from before the restart
+    assert list(r['H4'].iloc[-1]) == [1.0, 9.0, 0.5, 1.55]
+    assert list(r['D1'].index) == [pd.Timestamp('2019-09-09', tz='UTC')]
+    assert list(r['D1'].iloc[-1]) == [1.0, 9.0, 0.5, 1.55]
+    assert r['M1'].loc['2019-09-09 05:59', 'open'] == 1.5
+
+
+
+def test_cold_init_seeds_every_timeframe_d1_included(tmp_path):
+    from types import SimpleNamespace
+    from tradex.market.bars import TIMEFRAMES, Rollup
+    from tradex.market.buffers import BarWindow
+    from tradex.market.store import BarStore
+
+    written = []
+    parser = SimpleNamespace(
+        database_name='EURUSD', store=BarStore('EURUSD', root=str(tmp_path)),
+        windows={x: BarWindow(50) for x in TIMEFRAMES}, rollup=Rollup(),
+        writer=SimpleNamespace(write=lambda frame, key: written.append(key)),
+        client=SimpleNamespace(create_database=lambda name: None))
+    parser.fill_and_return_resampled_data = \
+        lambda frame: MarketParser.fill_and_return_resampled_data(
+            parser, frame)
+
+    minutes = pd.date_range(
+        '2019-09-09 00:00', '2019-09-10 05:59', freq='60s', tz='UTC')
+    MarketParser.init(parser, pd.DataFrame(
+        {'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5},
+        index=minutes))
+
+    assert sorted(written) == sorted(TIMEFRAMES)
+    assert list(parser.windows['D1'].to_frame().index) == list(
+        pd.to_datetime(['2019-09-09', '2019-09-10']))
+    assert len(parser.store.read('D1')) == 2
+
+def test_warm_start_seeds_windows_with_stored_bars(tmp_path):
+    from types import SimpleNamespace
+    from tradex.market.buffers import BarWindow
+    from tradex.market.store import BarStore
+
+    store = BarStore('EURUSD', root=str(tmp_path))
+    hours = pd.date_range('2019-09-02', periods=40, freq='1h', tz='UTC')
+    store.write('H1', pd.DataFrame(
+        {'open': np.arange(40.0), 'high': 50.0, 'low': 0.0, 'close': 1.0},
+        index=hours))
+
+    # bars rebuilt by the warm start replace the stored ones from 38:00
+    rebuilt = pd.DataFrame(
+        {'open': [-1.0, -2.0, -3.0], 'high': 50.0, 'low': 0.0, 'close': 1.0},
+        index=pd.date_range(hours[38], periods=3, freq='1h', tz='UTC'))
+
+    parser = SimpleNamespace(
+        store=store, windows={'H1': BarWindow(10), 'D1': BarWindow(5)})
+    MarketParser.seed_windows(parser, {'H1': rebuilt})
+    parser.windows['H1'].extend_frame(rebuilt)
+
+    frame = parser.windows['H1'].to_frame()
+    assert list(frame['open']) == [31.0 + x for x in range(7)] + [
+        -1.0, -2.0, -3.0]
+    assert len(parser.windows['D1']) == 0
+
+#################  BINARY BAR FRAMES #######################
+
+def test_bar_frames_round_trip_and_reject_garbage():
+    import struct
+    from tradex.market.bars import Bar
+    from tradex.market.wire import encode_bars, decode_bars, \
+        records_to_bars, WireError
+
+    bars = [Bar(60, 1.1, 1.3, 1.0, 1.2, 7), Bar(120, 1.2, 1.2, 1.2, 1.2, 1)]
+    frame = encode_bars(bars)
+    assert len(frame) == 8 + 2 * 48
+    assert records_to_bars(decode_bars(frame)) == bars
+    assert frame[8:56] == struct.pack('<q4dq', *bars[0])
+    assert encode_bars(iter(bars)) == frame
+    assert encode_bars(decode_bars(frame)) == frame
+    assert encode_bars([]) == frame[:4] + bytes(4)
+
+    for garbage in [b'', b'kill', frame[:-1], b'XXXX' + frame[4:],
+                    frame[:4] + b'\xff\xff\xff\xff' + frame[8:]]:
+        with pytest.raises(WireError):
+            decode_bars(garbage)
+
+
+#################  BINARY TICK MESSAGES #######################
+
+def test_binary_ticks_decode_into_tick_store():
+    from tradex.market.buffers import TickStore
+    from tradex.market.wire import encode_tick, encode_ticks, \
+        decode_ticks, WireError
+
+    topic, payload = encode_tick('EURUSD', 1.1, 1.2, 60.5)
+    assert topic == b'EURUSD' and len(payload) == 24
+
+    _, payload = encode_ticks(
+        'EURUSD', [(1.1, 1.2, 60.5), (1.3, 1.4, 61.0), (1.0, 1.1, 62.0)])
+    ticks = decode_ticks(payload)
+    assert list(ticks['bid']) == [1.1, 1.3, 1.0]
+    assert not ticks.flags.writeable
+
+    store = TickStore(capacity=4)
+    store.extend_ticks(decode_ticks(encode_tick('EURUSD', 1.0, 1.1, 59.0)[1]))
+    store.extend_ticks(ticks)
+    assert list(store.column('time')) == [59.0, 60.5, 61.0, 62.0]
+    assert list(store.column('ask')) == [1.1, 1.2, 1.4, 1.1]
+
+    for garbage in [b'', b'kill', payload[:-1]]:
+        with pytest.raises(WireError):
+            decode_ticks(garbage)
+
+
+#################  EVENT LOOP #######################
+
+def test_event_loop_dispatches_times_out_and_stops():
+    import zmq
+    from tradex.market.poller import EventLoop
+
+    ctx = zmq.Context()
+    a, b = ctx.socket(zmq.PAIR), ctx.socket(zmq.PAIR)
+    a.bind('inproc://event-loop')
+    b.connect('inproc://event-loop')
+
+    received, timeouts = [], []
+
+    def handler(frames):
+        received.append(frames)
+        return frames != [b'kill']
+
+    def idle():
+        # nothing was read for a while, send the rest then the kill code
+        timeouts.append(1)
+        a.send_multipart([b'EURUSD', b'tick'])
+        a.send(b'kill')
+
+    loop = EventLoop(timeout=10)
+    loop.register(b, handler)
+    loop.on_timeout(idle)
+
+    a.send_string('EURUSD 1.1;1.2;60.0')
+    loop.run()
+
+    assert received == [
+        [b'EURUSD 1.1;1.2;60.0'], [b'EURUSD', b'tick'], [b'kill']]
+    assert timeouts == [1] and not loop.running
+
+    a.close()
+    b.close()
+    ctx.term()
+
+
+#################  MULTI PAIR INGESTION HOST #######################
+
+def test_ingestion_host_routes_ticks_per_symbol():
+    import zmq
+    from tradex.market.host import IngestionHost
+    from tradex.market.wire import encode_tick, decode_bars, \
+        records_to_bars
+
+    ctx = zmq.Context()
+    # any free port, read back from the bound endpoint
+    host = IngestionHost(
+        ['EURUSD', 'GBPUSD'], push_port='*', tick_capacity=16, context=ctx)
+    port = host.push.getsockopt_string(zmq.LAST_ENDPOINT).rsplit(':', 1)[1]
+    pull = ctx.socket(zmq.PULL)
+    pull.connect(f'tcp://127.0.0.1:{port}')
+
+    host.handle_message([b'EURUSD 1.1;1.2;60.0'])
+    host.handle_message(encode_tick('GBPUSD', 1.5, 1.6, 61.0))
+    host.handle_message(encode_tick('USDJPY', 9.9, 9.9, 61.0))
+    host.handle_message(encode_tick('EURUSD', 1.3, 1.4, 125.0))
+
+    symbol, frame = pull.recv_multipart()
+    assert symbol == b'EURUSD'
+    assert [tuple(x) for x in records_to_bars(decode_bars(frame))] == \
+        [(60, 1.1, 1.1, 1.1, 1.1, 1)]
+
+    stats = host.stats
+    assert (stats['EURUSD'].ticks, stats['EURUSD'].bars) == (2, 1)
+    assert (stats['GBPUSD'].ticks, stats['GBPUSD'].bars) == (1, 0)
+    assert len(host.routes[b'GBPUSD'].ticks) == 1
+
+    assert host.on_message([b'EURUSD kill'])
+    assert pull.recv_multipart() == [b'EURUSD', b'kill']
+    assert not host.on_message([b'GBPUSD', b'kill'])
+
+    pull.close()
+    host.shutdown_sockets()
+
+
+#################  SHARDED INGESTION #######################
+
+def test_shard_assignment_is_stable_and_complete():
+    from tradex.config import MARKET_PAIRS
+    from tradex.market.shard import shard_of, assign
+
+    placement = assign(MARKET_PAIRS, 4)
+    assert sorted(sum(placement, [])) == sorted(MARKET_PAIRS)
+    assert all(shard_of(x, 4) == i for i, pairs in enumerate(placement)
+               for x in pairs)
+
+    # crc32 placement does not depend on the process (unlike hash())
+    assert shard_of('EURUSD', 4) == 0xf5f0daab % 4
+    assert assign(MARKET_PAIRS, 4) == placement
+
+
+def free_ports(count):
+    # First port of "count" consecutive free ports (the supervisor and its
+    # workers need them before binding)
+    import random
+    import socket
+
+    while True:
+        first = random.randint(20000, 60000)
+        sockets = []
+        try:
+            for port in range(first, first + count):
+                sock = socket.socket()
+                sockets.append(sock)
+                sock.bind(('127.0.0.1', port))
+            return first
+        except OSError:
+            continue
+        finally:
+            for sock in sockets:
+                sock.close()
+
+
+def wait_until(condition, timeout=10):
+    import time
+
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_shard_supervisor_restarts_a_killed_worker_and_resumes():
+    import time
+    import zmq
+    from threading import Thread
+    from tradex.market.shard import ShardSupervisor
+    from tradex.market.wire import encode_tick
+
+    ctx = zmq.Context()
+    feed = ctx.socket(zmq.PUB)
+    feed_port = feed.bind_to_random_port('tcp://127.0.0.1')
+    out = ctx.socket(zmq.PULL)
+
+    # merged output, supervisor feed, then one port per worker
+    out_port = free_ports(4)
+    base_port = out_port + 1
+    supervisor = ShardSupervisor(
+        ['EURUSD', 'USDJPY'], shards=2, sub_port=feed_port,
+        push_port=out_port, base_port=base_port, check_interval=0.05,
+        restart_delay=0.2)
+    assert supervisor.placement == [['USDJPY'], ['EURUSD']]
+    out.connect(f'tcp://127.0.0.1:{out_port}')
+    thread = Thread(target=supervisor.start, daemon=True)
+    thread.start()
+
+    clock = [0.0]
+
+    def routed(symbol, timeout=30):
+        # publishes ticks a minute apart until a bar of symbol comes out
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            clock[0] += 60
+            feed.send_multipart(encode_tick(symbol, 1.1, 1.2, clock[0]))
+            if out.poll(100) and out.recv_multipart()[0] == symbol.encode():
+                return True
+        return False
+
+    try:
+        assert routed('EURUSD') and routed('USDJPY')
+
+        killed = supervisor.processes[1]
+        killed.kill()
+        assert wait_until(lambda: supervisor.restarts[1] == 1)
+        assert wait_until(
+            lambda: supervisor.processes.get(1, killed) is not killed)
+
+        assert routed('EURUSD')
+        assert supervisor.processes[1].is_alive() and not supervisor.pending
+
+        # a shard crashing too often in a row is given up on
+        supervisor.max_restarts = 1
+        supervisor.processes[1].kill()
+        assert wait_until(
+            lambda: 1 not in supervisor.processes and
+            1 not in supervisor.pending)
+        assert routed('USDJPY')
+    finally:
+        supervisor.running = False
+        thread.join(10)
+        feed.close(linger=0)
+        out.close(linger=0)
+        ctx.term()
+
+    assert not thread.is_alive()
@@ -10,6 +10,7 @@ from tradex.patterns.base import BasePattern
 
 # from tradex.patterns.multiliner import MorningStar,EveningStar
 import pandas as pd
+import numpy as np
 
 
 #################### JUST TESTED THE BASE PATTERN ##########################
@@ -42,3 +43,193 @@ def test_base_methods(setup_base_pattern):
 
 
 
+
+
+#################### ONE LINE PATTERN KERNELS ##########################
+
+@pytest.fixture
+def one_line_bars():
+
+    return pd.DataFrame(
+        [[1.0, 2.0, 0.5, 1.0],     # doji
+         [1.0, 5.0, 1.0, 1.0],     # gravestone doji
+         [2.0, 3.0, 0.0, 3.0],     # bullish hammer
+         [3.0, 3.0, 0.0, 2.0],     # bearish hammer
+         [1.0, 4.0, 1.0, 2.0],     # bullish inverted hammer
+         [4.0, 7.0, 0.0, 6.0],     # bullish pinbar
+         [np.nan, 1.0, 1.0, 1.0]],
+        columns=['open', 'high', 'low', 'close'])
+
+
+def test_one_line_kernels(one_line_bars):
+    from tradex.patterns.oneliner import Doji, GravestoneDoji,\
+        DragonFlyDoji, Hammer, InvertedHammer, Pinbar, InvertedPinbar
+
+    expected = {
+        Doji: [1, 1, 0, 0, 0, 0, 0],
+        GravestoneDoji: [0, -1, 0, 0, 0, 0, 0],
+        DragonFlyDoji: [0, 0, 0, 0, 0, 0, 0],
+        Hammer: [0, 0, 1, -1, 0, 0, 0],
+        InvertedHammer: [0, 0, 0, 0, 1, 0, 0],
+        Pinbar: [0, 0, 0, 0, 0, 1, 0],
+        InvertedPinbar: [0, 0, 0, 0, 0, 0, 0],
+    }
+
+    for pattern, signals in expected.items():
+        truth = pattern(one_line_bars).iterate()
+        assert truth.dtype == np.int8
+        assert truth.tolist() == signals, pattern.__name__
+
+
+#################### TWO LINE PATTERN ENGINE ##########################
+
+def test_two_line_engine():
+    from tradex.patterns.doubleliner import Harami, HaramiCross,\
+        Engulfing, PiercingDarkCloud
+
+    frame = pd.DataFrame(
+        [[3.0, 3.1, 1.9, 2.0], [1.0, 2.9, 0.9, 2.8],    # engulfing
+         [4.0, 4.1, 1.9, 2.0], [1.5, 3.8, 1.4, 3.5],    # piercing
+         [1.0, 5.1, 0.9, 5.0], [3.0, 3.2, 2.4, 2.5],    # harami
+         [5.0, 5.1, 0.9, 1.0], [3.0, 4.0, 2.0, 3.0]],   # harami cross
+        columns=['open', 'high', 'low', 'close'])
+
+    expected = {
+        Harami: [0, 0, 0, 0, 0, -1, 0, 0],
+        HaramiCross: [0, 0, 0, 0, 0, 0, 0, 1],
+        Engulfing: [0, 1, -1, 0, 0, 0, 0, 0],
+        PiercingDarkCloud: [0, 1, 0, 1, 0, 0, 0, 0],
+    }
+
+    for pattern, signals in expected.items():
+        truth = pattern(frame).iterate()
+        assert truth.dtype == np.int8
+        assert truth.tolist() == signals, pattern.__name__
+
+    # a nan bar is neither bullish, bearish nor a doji
+    frame.iloc[7, [0, 3]] = np.nan
+    assert HaramiCross(frame).iterate()[-1] == 0
+
+
+#################### MULTI LINE WINDOW ENGINE ##########################
+
+def test_multi_line_windows_and_stars():
+    from tradex.patterns.multiliner import windows, MorningStar,\
+        EveningStar, MultiLinePattern
+
+    bars = np.arange(20, dtype=np.float64).reshape(5, 4)
+    view = windows(bars, 3)
+    assert view.shape == (3, 3, 4) and not view.flags.writeable
+    assert view[2, 0].tolist() == bars[2].tolist()
+    assert windows(bars, 6).shape == (0, 6, 4)
+
+    frame = pd.DataFrame(
+        [[1.0, 1.0, 1.0, 1.0],
+         [6.0, 5.0, 2.0, 3.0], [3.0, 2.0, 1.0, 3.0], [3.0, 2.0, 6.0, 5.0],
+         [3.0, 3.0, 6.0, 5.0], [5.0, 5.0, 6.0, 4.0], [5.0, 5.0, 6.0, 1.0]],
+        columns=['open', 'high', 'low', 'close'])
+
+    # both stars are signalled with 1, as they always were
+    assert MorningStar(frame).iterate().tolist() == [0, 0, 0, 1, 0, 0, 0]
+    assert EveningStar(frame).iterate().tolist() == [0, 0, 0, 0, 0, 0, 1]
+
+    # window length is per pattern, no signals by default
+    assert MultiLinePattern(frame, length=5).iterate().tolist() == [0] * 7
+    assert MorningStar(frame.iloc[:2]).iterate().tolist() == [0, 0]
+
+
+def test_pattern_stream_matches_batch_replay():
+    from tradex.patterns.stream import PatternStream
+    from tradex.patterns.oneliner import Hammer, Pinbar, Doji, SpinningTop
+    from tradex.patterns.doubleliner import Harami, Engulfing,\
+        PiercingDarkCloud
+    from tradex.patterns.multiliner import MorningStar, EveningStar
+
+    # a few price levels only, so that patterns do show up
+    rng = np.random.RandomState(3)
+    ohlc = rng.randint(1, 6, size=(400, 4)).astype(np.float64)
+    ohlc[rng.rand(400) < 0.02] = np.nan
+    frame = pd.DataFrame(ohlc, columns=['open', 'high', 'low', 'close'])
+
+    patterns = [Hammer, Pinbar, Doji, Harami, Engulfing, PiercingDarkCloud,
+                MorningStar, EveningStar]
+    stream = PatternStream(patterns)
+    assert stream.k == 3
+
+    replay = stream.extend(frame[:250])
+    for i in range(250, 400):
+        for name, signal in stream.update(*ohlc[i]).items():
+            replay[name] = np.append(replay[name], signal)
+    assert len(stream) == 3
+
+    for pattern in patterns:
+        np.testing.assert_array_equal(
+            replay[pattern.__name__], pattern(frame).iterate())
+    assert any(replay[x.__name__].any() for x in patterns)
+
+    with pytest.raises(TypeError):
+        PatternStream([SpinningTop])
+
+
+def test_combo_scan_computes_each_primitive_once():
+    import talib
+    from tradex.patterns.combos import Base
+
+    rng = np.random.RandomState(1)
+    close = np.round(1 + np.cumsum(rng.randn(500) * 0.001), 3)
+    op = np.r_[close[0], close[:-1]]
+    array = np.column_stack([
+        op, np.maximum(op, close) + 0.001 * (rng.rand(500) < 0.5),
+        np.minimum(op, close) - 0.001 * (rng.rand(500) < 0.5), close])
+
+    names = ['bull_RhammerThrice', 'bear_hammer_inverse',
+             'bear_RmarubozuTwice_gravestone', 'bull_marubozu_dragonfly']
+    assert Base.requires(names) == [
+        'CDLHAMMER', 'CDLINVERTEDHAMMER', 'CDLMARUBOZU', 'CDLGRAVESTONEDOJI',
+        'CDLDRAGONFLYDOJI']
+
+    base = Base(array)
+    results = base.scan(names)
+    assert sorted(base.primitives) == sorted(Base.requires(names))
+    np.testing.assert_array_equal(
+        base.primitive('CDLHAMMER'), talib.CDLHAMMER(*array.T))
+
+    # computed once, shared read only, and reused by a Base given the memo
+    assert base.primitive('CDLHAMMER') is base.primitives['CDLHAMMER']
+    with pytest.raises(ValueError):
+        base.primitive('CDLHAMMER')[0] = 100
+    shared = Base(array, primitives=base.primitives)
+    assert shared.primitive('CDLMARUBOZU') is base.primitive('CDLMARUBOZU')
+
+    for name in names:
+        np.testing.assert_array_equal(
+            results[name], getattr(Base(array), name)())
+
+    everything = Base(array, indicator_array=array[:, 3]).scan()
+    assert len(everything) == len(Base.combos()) == 40
+
+
+def test_combo_primitives_match_their_uses_declaration():
+    import inspect
+    import re
+    from tradex.patterns.combos import Base, UndeclaredPrimitive, uses
+
+    # every literal primitive a combo fetches is declared and vice versa
+    for name in Base.combos():
+        combo = getattr(Base, name)
+        fetched = re.findall(
+            r"self\.primitive\(\s*'(\w+)'", inspect.getsource(combo))
+        assert set(fetched) == set(combo.primitives), name
+
+    class Drifted(Base):
+        @uses('CDLHAMMER')
+        def drifted(self):
+            return self.primitive('CDLHAMMER') + self.primitive('CDLDOJI')
+
+    array = np.column_stack([np.linspace(1, 2, 50)] * 4)
+    with pytest.raises(UndeclaredPrimitive):
+        Drifted(array).scan(['drifted'])
+    with pytest.raises(UndeclaredPrimitive):
+        Drifted(array).drifted()
+    # outside of a combo any primitive can still be read
+    assert len(Drifted(array).primitive('CDLDOJI')) == 50
@@ -0,0 +1,242 @@
+import pytest
+import numpy as np
+import pandas as pd
+import talib
+from tradex.strategy.indicators import Indicator
+from tradex.strategy.streaming import engine_for, Streaming, Windowed
+from tradex.strategy.registry import IndicatorRegistry
+
+
+@pytest.fixture
+def bars():
+
+    rng = np.random.RandomState(7)
+    close = 1.1 + np.cumsum(rng.randn(600) * 0.001)
+    frame = pd.DataFrame(
+        {'open': close, 'high': close + rng.rand(600) * 0.001,
+         'low': close - rng.rand(600) * 0.001, 'close': close,
+         'volume': np.arange(600) % 7 * 100.0},
+        index=pd.date_range('2019-09-02', periods=600, freq='60s'))
+
+    # a flat stretch, where ranges and gains/losses are all zero
+    frame.iloc[200:220] = frame.iloc[200].close
+    return frame
+
+
+def outputs(value):
+    return [value] if isinstance(value, np.ndarray) else list(value)
+
+
+################ STREAMING INDICATOR ENGINE ###################
+
+@pytest.mark.parametrize('func, lis, kwargs', [
+    (talib.SMA, ['close'], {'timeperiod': 20}),
+    (talib.EMA, ['close'], {'timeperiod': 20}),
+    (talib.RSI, ['close'], {}),
+    (talib.MACD, ['close'],
+        {'fastperiod': 6, 'slowperiod': 13, 'signalperiod': 4}),
+    (talib.STOCH, ['high', 'low', 'close'], {}),
+    (talib.ADX, ['high', 'low', 'close'], {}),
+    (talib.DEMA, ['close'], {'timeperiod': 10}),
+    (talib.TEMA, ['close'], {'timeperiod': 7}),
+    (talib.ATR, ['high', 'low', 'close'], {}),
+    (talib.NATR, ['high', 'low', 'close'], {'timeperiod': 5}),
+    (talib.OBV, ['close', 'volume'], {}),
+    (talib.AD, ['high', 'low', 'close', 'volume'], {}),
+])
+def test_streaming_kernels_match_talib_replay(bars, func, lis, kwargs):
+
+    engine = engine_for(func, len(lis), kwargs)
+    assert isinstance(engine, Streaming)
+
+    # replayed in uneven chunks, as bars would arrive
+    chunks = [engine.update(*[bars[x].values[s:s + 13] for x in lis])
+              for s in range(0, len(bars), 13)]
+    expected = outputs(func(*[bars[x].values for x in lis], **kwargs))
+
+    for i, values in enumerate(expected):
+        got = np.concatenate([x[i] for x in chunks])
+        np.testing.assert_allclose(got, values, rtol=1e-9, atol=1e-9)
+
+
+def test_windowed_fallback_only_keeps_its_lookback(bars):
+
+    engine = engine_for(talib.BBANDS, 1, {'timeperiod': 10})
+    assert isinstance(engine, Windowed)
+
+    chunks = [engine.update(bars.close.values[s:s + 7])
+              for s in range(0, len(bars), 7)]
+    assert len(engine._history[0]) == engine.window - 1 == 9
+
+    for i, values in enumerate(talib.BBANDS(bars.close.values, 10)):
+        np.testing.assert_allclose(
+            np.concatenate([x[i] for x in chunks]), values, rtol=1e-9)
+
+
+def test_indicator_update_feeds_only_new_rows(bars):
+
+    macd = Indicator(
+        'macd', talib.MACD, no=3, fastperiod=6, slowperiod=13,
+        signalperiod=4)
+    stoch = Indicator('stoch', talib.STOCH, lis=['high', 'low', 'close'],
+                      no=2)
+
+    # growing history, one new bar at a time, the way Strat2 feeds it
+    for i in range(1, 120):
+        macd.update(bars.iloc[:i])
+        stoch.update(bars.iloc[:i])
+
+    # an update without new rows appends nothing
+    macd.update(bars.iloc[:119])
+    assert len(macd.v1) == len(stoch.v2) == 119
+
+    expected = talib.MACD(bars.close.values[:119], 6, 13, 4)
+    np.testing.assert_allclose(macd.v3, expected[2], rtol=1e-9)
+    np.testing.assert_allclose(
+        stoch.v1, talib.STOCH(*[bars[x].values[:119] for x in [
+            'high', 'low', 'close']])[0], rtol=1e-9)
+
+
+@pytest.mark.parametrize('func, lis, no', [
+    (talib.ADXR, ['high', 'low', 'close'], 1),
+    (talib.KAMA, ['close'], 1),
+    (talib.STOCHRSI, ['close'], 2),
+    (talib.SAR, ['high', 'low'], 1),
+])
+def test_stateful_functions_keep_a_bounded_history(bars, func, lis, no):
+
+    indicator = Indicator(func.__name__, func, lis=lis, no=no)
+    assert isinstance(indicator.engine, Windowed)
+
+    # one bar at a time, as a live strategy feeds it
+    for i in range(1, len(bars) + 1):
+        indicator.update(bars.iloc[:i])
+
+    # the history stops growing at the window, the values stay within
+    # a tiny drift of a run over the whole history
+    assert len(indicator.engine._history[0]) == indicator.engine.window - 1
+    assert indicator.engine.window < len(bars)
+
+    expected = outputs(func(*[bars[x].values for x in lis]))
+    for got, values in zip(indicator.values, expected):
+        np.testing.assert_allclose(got, values, rtol=1e-7, atol=1e-9)
+
+################ INDICATOR OUTPUT BUFFER ###################
+
+def test_indicator_outputs_grow_in_place_and_are_named(bars):
+
+    macd = Indicator(
+        'macd', talib.MACD, no=3, names=['macd', 'signal', 'hist'],
+        capacity=4, fastperiod=6, slowperiod=13, signalperiod=4)
+    macd.update(bars.iloc[:50], u=True)
+    for i in range(51, 60):
+        macd.update(bars.iloc[:i])
+
+    assert len(macd) == 59 and macd._store.capacity == 64
+    assert macd.values.shape == (3, 59)
+    np.testing.assert_array_equal(macd.hist, macd.v3)
+    np.testing.assert_allclose(
+        macd.values, talib.MACD(bars.close.values[:59], 6, 13, 4))
+
+    with pytest.raises(ValueError):
+        macd.v1[-1] = 0.0
+    with pytest.raises(AttributeError):
+        macd.v4
+
+
+def test_indicator_maxlen_keeps_the_newest_values(bars):
+
+    ema = Indicator('ema', talib.EMA, maxlen=10, timeperiod=5)
+    ema.update(bars, u=True)
+
+    assert len(ema.v1) == 10
+    np.testing.assert_allclose(
+        ema.v1, talib.EMA(bars.close.values, 5)[-10:])
+
+    with pytest.raises(ValueError):
+        Indicator('ema', talib.EMA, names=['a', 'b'])
+
+
+################ INDICATOR REGISTRY ###################
+
+def test_registry_dedupes_specs_and_batches_series(bars):
+
+    registry = IndicatorRegistry(workers=2)
+    ema = registry.register(('EURUSD', 'M5'), 'ema', talib.EMA, timeperiod=50)
+    assert registry.register(
+        ('EURUSD', 'M5'), 'other', talib.EMA, timeperiod=50) is ema
+    assert registry.register(
+        ('GBPUSD', 'M5'), 'ema', talib.EMA, timeperiod=50) is not ema
+    adx = registry.register(
+        ('EURUSD', 'M5'), 'adx', talib.ADX, lis=['high', 'low', 'close'])
+    assert len(registry.indicators()) == 3
+
+    for i in range(60, 80):
+        registry.update({('EURUSD', 'M5'): bars.iloc[:i],
+                         ('GBPUSD', 'M5'): bars.iloc[:i] * 2})
+
+    # the same bar again is served from the per bar cache
+    registry.update({('EURUSD', 'M5'): bars.iloc[:79]})
+    registry.close()
+
+    assert len(ema.v1) == len(adx.v1) == 20
+    np.testing.assert_allclose(
+        ema.v1, talib.EMA(bars.close.values[:79], 50)[-20:])
+    gbp = registry.indicators(('GBPUSD', 'M5'))[0]
+    np.testing.assert_allclose(gbp.v1, ema.v1 * 2)
+
+
+
+def test_registry_feeds_each_bar_once_under_concurrent_updates(bars):
+    from concurrent.futures import ThreadPoolExecutor
+
+    registry = IndicatorRegistry()
+    ema = registry.register(('EURUSD', 'M1'), 'ema', talib.EMA, timeperiod=9)
+    macd = registry.register(('EURUSD', 'M1'), 'macd', talib.MACD, no=3)
+
+    # many strategy threads pushing the same newest bar at once
+    with ThreadPoolExecutor(8) as pool:
+        for i in range(100, 300):
+            list(pool.map(
+                lambda _: registry.update({('EURUSD', 'M1'): bars.iloc[:i]}),
+                range(8)))
+
+    assert len(ema) == len(macd) == 200
+    np.testing.assert_allclose(
+        ema.v1, talib.EMA(bars.close.values[:299], 9)[-200:], rtol=1e-9)
+    np.testing.assert_allclose(
+        macd.v1, talib.MACD(bars.close.values[:299])[0][-200:], rtol=1e-9)
+
+################ MEMOIZED INDICATOR CACHE ###################
+
+def test_indicator_cache_hits_invalidates_and_evicts(bars):
+    from tradex.strategy.cache import IndicatorCache
+
+    calls = []
+
+    def inputs():
+        calls.append(1)
+        return [bars.close.values]
+
+    cache = IndicatorCache(budget=3 * 600 * 8)
+    first = cache.get('EURUSD', 1, talib.EMA, inputs, timeperiod=20)
+    assert cache.get('EURUSD', 1, talib.EMA, inputs, timeperiod=20) is first
+    assert (cache.hits, cache.misses, len(calls)) == (1, 1, 1)
+    with pytest.raises(ValueError):
+        first[-1] = 0.0
+
+    cache.get('EURUSD', 1, talib.EMA, inputs, timeperiod=50)
+    cache.get('GBPUSD', 1, talib.EMA, inputs, timeperiod=20)
+    assert len(cache) == 3
+
+    # a new bar drops the older version of that series only
+    cache.get('EURUSD', 2, talib.EMA, inputs, timeperiod=20)
+    assert len(cache) == 2 and cache.misses == 4
+
+    # over budget, the least recently used entry goes
+    cache.get('GBPUSD', 1, talib.EMA, inputs, timeperiod=20)
+    cache.get('EURUSD', 2, talib.SMA, inputs)
+    cache.get('EURUSD', 2, talib.RSI, inputs)
+    assert len(cache) == 3 and cache.nbytes <= cache.budget
+    cache.get('EURUSD', 2, talib.EMA, inputs, timeperiod=20)
+    assert (cache.hits, cache.misses) == (2, 7)